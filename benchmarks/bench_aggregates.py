@@ -0,0 +1,87 @@
+"""
+Measures the vectorized country aggregates against Python loops on synthetic
+tables with millions of countries.
+
+Run from the repository root, optionally passing the numbers of countries:
+    python -m benchmarks.bench_aggregates 1000000 5000000
+"""
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from country_aggregates import CountryAggregates
+
+CONTINENTS = ['Africa', 'Antarctica', 'Asia', 'Europe', 'North America', 'Oceania', 'South America']
+
+
+def create_aggregates(count, rng):
+    """
+    Returns aggregates of count random countries, 1% of them without an area
+    and 5% of them on a second continent.
+    """
+    areas = rng.integers(0, 10_000_000, count).astype(float)
+    areas[rng.random(count) < 0.01] = 0
+    populations = rng.integers(0, 1_000_000_000, count).astype(float)
+    countries = np.arange(count)
+    continents = rng.integers(0, len(CONTINENTS), count)
+    second = countries[rng.random(count) < 0.05]
+    return CountryAggregates(
+        [f"country{i}" for i in range(count)], areas, populations, CONTINENTS,
+        np.concatenate((countries, second)),
+        np.concatenate((continents, rng.integers(0, len(CONTINENTS), len(second)))))
+
+
+def python_loops(aggregates):
+    """
+    Computes the densities and per-continent statistics row by row, like the
+    loop in get_continent_area_and_population_by_id.
+    """
+    areas = aggregates.values['area'].tolist()
+    populations = aggregates.values['population'].tolist()
+    densities = [population / area if area else None
+                 for area, population in zip(areas, populations)]
+    groups = {}
+    for country, continent in zip(aggregates.membership_countries.tolist(),
+                                  aggregates.membership_continents.tolist()):
+        groups.setdefault(continent, []).append(country)
+    summary = {}
+    for continent, members in groups.items():
+        member_densities = [densities[i] for i in members if densities[i] is not None]
+        summary[continent] = (
+            sum(areas[i] for i in members),
+            statistics.median(areas[i] for i in members),
+            statistics.median(member_densities),
+        )
+    top = sorted((value, index) for index, value in enumerate(densities)
+                 if value is not None)[-10:]
+    return summary, top
+
+
+def run(count):
+    """
+    Prints the timings for count synthetic countries.
+    """
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    aggregates = create_aggregates(count, rng)
+    load = time.perf_counter() - start
+    start = time.perf_counter()
+    aggregates.summary()
+    summary = time.perf_counter() - start
+    start = time.perf_counter()
+    aggregates.top('density', 10)
+    top = time.perf_counter() - start
+    print(f"{count} countries (arrays built in {load * 1000:.0f} ms)")
+    print(f"  numpy summary  {summary * 1000:10.1f} ms")
+    print(f"  numpy top 10   {top * 1000:10.1f} ms")
+    if count <= 1_000_000:
+        start = time.perf_counter()
+        python_loops(aggregates)
+        print(f"  python loops   {(time.perf_counter() - start) * 1000:10.1f} ms")
+
+
+if __name__ == '__main__':
+    for size in [int(arg) for arg in sys.argv[1:]] or [1_000_000, 5_000_000]:
+        run(size)
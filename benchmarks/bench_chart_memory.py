@@ -0,0 +1,57 @@
+"""
+Renders every chart of the country database many times without the chart
+cache and checks with tracemalloc that the memory in use stays flat, once
+garbage collection has freed the figures.
+
+Run from the repository root, optionally passing the number of renders and the
+allowed growth in KiB; the exit status is 1 if the memory grew by more:
+    python -m benchmarks.bench_chart_memory 1000 512
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from database_operations.database_config import connect
+from visual_helper import CHARTS, render_chart
+
+COUNTRY_DB_PATH = 'database/countries.db'
+WARM_UP_RENDERS = 20
+
+
+def run(renders, allowed_growth):
+    """
+    Prints the memory in use after the warm-up and after all renders.
+
+    Returns:
+        bool: True if the memory grew by at most allowed_growth bytes.
+    """
+    connection = connect(COUNTRY_DB_PATH, 'countries')
+    names = list(CHARTS)
+    for index in range(WARM_UP_RENDERS):
+        render_chart(names[index % len(names)], connection)
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    for index in range(renders):
+        render_chart(names[index % len(names)], connection)
+        if (index + 1) % (renders // 4 or 1) == 0:
+            gc.collect()
+            current, _ = tracemalloc.get_traced_memory()
+            print(f"  {index + 1:6} renders  {(current - baseline) / 1024:10.1f} KiB")
+    duration = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    connection.close()
+    growth = current - baseline
+    print(f"{renders} renders in {duration:.1f} s: grew {growth / 1024:.1f} KiB "
+          f"(peak {(peak - baseline) / 1024:.1f} KiB, allowed {allowed_growth / 1024:.0f} KiB)")
+    return growth <= allowed_growth
+
+
+if __name__ == '__main__':
+    arguments = [int(arg) for arg in sys.argv[1:]]
+    renders, allowed_kib = arguments + [1000, 512][len(arguments):]
+    sys.exit(0 if run(renders, allowed_kib * 1024) else 1)
@@ -0,0 +1,71 @@
+"""
+Compares how many random draws the quiz needs to find three options with
+different values, using rejection sampling versus the snapshot's AttributeIndex.
+
+Run from the repository root:
+    python -m benchmarks.bench_distractors
+"""
+import random
+import time
+
+from country import Country
+from country_snapshot import CountrySnapshot, get_country_snapshot
+
+KEYS = {
+    'capital': lambda c: tuple(c.capital),
+    'population': lambda c: c.population,
+    'area': lambda c: c.area,
+    'currency': lambda c: c.currency,
+}
+
+
+def rejection_sample(countries, attribute):
+    """
+    Draws three countries until their values differ, like the quiz used to.
+
+    Returns:
+        int: The number of countries drawn.
+    """
+    key = KEYS[attribute]
+    draws = 0
+    while True:
+        options = random.sample(countries, 3)
+        draws += 3
+        values = [key(c) for c in options]
+        if len(set(values)) == 3 and (attribute != 'currency' or 'None' not in values):
+            return draws
+
+
+def euro_heavy(snapshot, share):
+    """
+    Returns a copy of the snapshot in which the given share of countries uses the Euro.
+    """
+    countries = [
+        Country(c.official_name, c.capital, c.continent, c.borders, c.population,
+                c.area, c.languages, 'Euro (€)' if random.random() < share else c.currency)
+        for c in snapshot.countries]
+    return CountrySnapshot(countries)
+
+
+def run(name, snapshot, rounds=20000):
+    """
+    Prints the mean and maximum draws and the time per question for each attribute.
+    """
+    print(name)
+    for attribute in KEYS:
+        start = time.perf_counter()
+        draws = [rejection_sample(snapshot.countries, attribute) for _ in range(rounds)]
+        rejection_time = (time.perf_counter() - start) / rounds
+        start = time.perf_counter()
+        for _ in range(rounds):
+            snapshot.get_countries_with_distinct(attribute)
+        index_time = (time.perf_counter() - start) / rounds
+        print(f"  {attribute:<10} rejection: mean {sum(draws) / rounds:6.2f} draws, "
+              f"max {max(draws):4d}, {rejection_time * 1e6:6.1f} us | "
+              f"index: 3 draws, {index_time * 1e6:6.1f} us")
+
+
+if __name__ == '__main__':
+    country_snapshot = get_country_snapshot("database/countries.db")
+    run("countries.db", country_snapshot)
+    run("synthetic, 95% Euro", euro_heavy(country_snapshot, 0.95))
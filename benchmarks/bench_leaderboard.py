@@ -0,0 +1,70 @@
+"""
+Measures the highscore queries of the user database before and after the
+index migration, for a range of table sizes.
+
+Run from the repository root, optionally passing the numbers of users:
+    python -m benchmarks.bench_leaderboard 10000 1000000 10000000
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from database_operations.user_database_operations import (
+    check_username_exists, get_rank_for_username, get_top_ten_score, migrate_user_db)
+
+
+def create_users(path, count):
+    """
+    Creates a user database with count users that have random scores.
+    """
+    connection = sqlite3.connect(path)
+    connection.execute('''CREATE TABLE Users (
+                            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            name TEXT NOT NULL,
+                            score INTEGER DEFAULT 0)''')
+    connection.executemany(
+        "INSERT INTO Users (name, score) VALUES (?, ?)",
+        ((f"user{i}", random.randint(0, 40) * 50) for i in range(count)))
+    connection.commit()
+    return connection
+
+
+def measure(function, repeat=20):
+    """
+    Returns the mean duration of function() in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(count):
+    """
+    Prints the query timings for a table with count users.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        connection = create_users(os.path.join(directory, 'user.db'), count)
+        name = f"user{count // 2}"
+        queries = {
+            'top ten': lambda: get_top_ten_score(connection),
+            'username exists': lambda: check_username_exists(connection, name),
+            'rank': lambda: get_rank_for_username(connection, name),
+        }
+        before = {label: measure(query, 3) for label, query in queries.items()}
+        start = time.perf_counter()
+        migrate_user_db(connection)
+        migration = time.perf_counter() - start
+        after = {label: measure(query) for label, query in queries.items()}
+        connection.close()
+    print(f"{count} users (migration {migration:.2f} s)")
+    for label in queries:
+        print(f"  {label:<16} {before[label]:10.3f} ms -> {after[label]:8.3f} ms")
+
+
+if __name__ == '__main__':
+    for size in [int(arg) for arg in sys.argv[1:]] or [10_000, 1_000_000]:
+        run(size)
@@ -0,0 +1,66 @@
+"""
+Measures the import time and resident memory of the app module in a fresh
+interpreter, once as the app loads and once with the chart and statistics
+modules imported eagerly as before, and the duration of the warm-up.
+
+Run from the repository root, optionally passing the number of runs:
+    python -m benchmarks.bench_startup 5
+"""
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ('matplotlib', 'numpy', 'pandas', 'scipy')
+
+MEASURE = '''
+import sys, time
+start = time.perf_counter()
+import landing_page
+{extra}
+duration = time.perf_counter() - start
+start = time.perf_counter()
+{warm_up}
+warm_up = time.perf_counter() - start
+with open('/proc/self/status', encoding='utf-8') as status:
+    rss = next(int(line.split()[1]) for line in status if line.startswith('VmRSS:'))
+loaded = [name for name in {heavy_modules!r} if name in sys.modules]
+print(duration, rss, warm_up, ','.join(loaded))
+'''
+
+VARIANTS = {
+    'lazy': {'extra': '', 'warm_up': ''},
+    'eager': {'extra': 'import visual_helper, statistics_service', 'warm_up': ''},
+    'lazy + warm-up': {'extra': '', 'warm_up': 'landing_page.warm_up()'},
+}
+
+
+def measure(extra, warm_up):
+    """
+    Imports the app in a new interpreter.
+
+    Returns:
+        tuple: The import time in seconds, the resident memory in KiB, the
+        warm-up time in seconds and the heavy modules that were loaded.
+    """
+    code = MEASURE.format(extra=extra, warm_up=warm_up, heavy_modules=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                            text=True, check=True).stdout.splitlines()[-1]
+    duration, rss, warm_up_duration, loaded = output.split(' ')
+    return float(duration), int(rss), float(warm_up_duration), loaded or '-'
+
+
+def run(runs):
+    """
+    Prints the median import time and memory of every variant.
+    """
+    for label, variant in VARIANTS.items():
+        results = [measure(**variant) for _ in range(runs)]
+        duration = statistics.median(result[0] for result in results)
+        rss = statistics.median(result[1] for result in results)
+        warm_up = statistics.median(result[2] for result in results)
+        print(f"{label:<15} import {duration * 1000:7.0f} ms  warm-up {warm_up * 1000:6.0f} ms  "
+              f"RSS {rss / 1024:6.1f} MiB  heavy modules: {results[0][3]}")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,101 @@
+"""
+Stress test for the user database: several processes insert scores while
+others read the highscore queries, once with the rollback journal the
+database used before and once with the settings of database_config.
+
+Run from the repository root, optionally passing the duration in seconds and
+the numbers of writer and reader processes:
+    python -m benchmarks.stress_user_db 10 4 8
+"""
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from database_operations.database_config import configure_connection, get_database_config
+from database_operations.user_database_operations import (
+    create_tables_for_user_db, set_user_scores)
+
+LEGACY_CONFIG = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+
+def write_scores(path, config, duration, worker, results):
+    """
+    Inserts one score per commit until the duration has passed.
+    """
+    connection = configure_connection(sqlite3.connect(path), config)
+    written = failed = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        if set_user_scores(connection, [(f"writer{worker}-{written}", written % 2000)]):
+            written += 1
+        else:
+            failed += 1
+    connection.close()
+    results.put(('write', written, failed))
+
+
+def read_leaderboard(path, config, duration, results):
+    """
+    Runs the top ten and rank queries until the duration has passed.
+    """
+    connection = configure_connection(
+        sqlite3.connect(path), config, read_only=True)
+    queries = 0
+    failed = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        try:
+            connection.execute(
+                "SELECT user_id, name, score FROM Users ORDER BY score DESC LIMIT 10"
+            ).fetchall()
+            connection.execute(
+                "SELECT COUNT(*) FROM Users WHERE score > ?", (1000,)).fetchone()
+            queries += 1
+        except sqlite3.OperationalError:
+            failed += 1
+    connection.close()
+    results.put(('read', queries, failed))
+
+
+def run(label, config, duration, writers, readers):
+    """
+    Prints the write and read throughput and the number of failures for a config.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'user.db')
+        connection = configure_connection(sqlite3.connect(path), config)
+        create_tables_for_user_db(connection)
+        set_user_scores(connection, [(f"user{i}", i % 2000) for i in range(100_000)])
+        connection.close()
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=write_scores, args=(path, config, duration, worker, results))
+            for worker in range(writers)
+        ] + [
+            multiprocessing.Process(
+                target=read_leaderboard, args=(path, config, duration, results))
+            for _ in range(readers)
+        ]
+        for process in processes:
+            process.start()
+        totals = {'write': [0, 0], 'read': [0, 0]}
+        for _ in processes:
+            kind, done, failed = results.get()
+            totals[kind][0] += done
+            totals[kind][1] += failed
+        for process in processes:
+            process.join()
+    print(f"{label}: {config}")
+    print(f"  writes {totals['write'][0] / duration:10.1f}/s  failed {totals['write'][1]}")
+    print(f"  reads  {totals['read'][0] / duration:10.1f}/s  failed {totals['read'][1]}")
+
+
+if __name__ == '__main__':
+    arguments = [int(arg) for arg in sys.argv[1:]]
+    duration, writers, readers = arguments + [5, 4, 8][len(arguments):]
+    run('rollback journal', LEGACY_CONFIG, duration, writers, readers)
+    run('configured', get_database_config('users'), duration, writers, readers)
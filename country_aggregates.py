@@ -0,0 +1,214 @@
+"""
+This module aggregates the area, population and population density of the
+countries, overall and per continent, with vectorized NumPy operations on
+columns that are loaded once per version of the country database.
+"""
+import numpy as np
+
+from database_operations.connection_pool import FileStampCache
+from database_operations.countries_database_operations import get_database_version
+
+METRICS = ('area', 'population', 'density')
+
+
+class CountryAggregates:
+    """
+    The area, population and density columns of all countries and their
+    continent memberships as NumPy arrays.
+
+    A country can lie on several continents, so per-continent statistics are
+    computed over (country, continent) membership pairs. Countries with an area
+    of 0 have no density (NaN) and are left out of the density statistics.
+    """
+
+    def __init__(self, names, areas, populations, continents,
+                 membership_countries, membership_continents, version=None):
+        self.version = version
+        self.names = list(names)
+        self.continents = list(continents)
+        self.continent_indexes = {
+            continent: index for index, continent in enumerate(self.continents)}
+        areas = np.asarray(areas, dtype=float)
+        populations = np.asarray(populations, dtype=float)
+        density = np.full(len(areas), np.nan)
+        np.divide(populations, areas, out=density, where=areas > 0)
+        self.values = {'area': areas, 'population': populations, 'density': density}
+        self.membership_countries = np.asarray(membership_countries, dtype=np.intp)
+        self.membership_continents = np.asarray(membership_continents, dtype=np.intp)
+        order = np.argsort(self.membership_continents, kind='stable')
+        self._grouped_countries = self.membership_countries[order]
+        self._group_bounds = np.searchsorted(
+            self.membership_continents[order], np.arange(len(self.continents) + 1))
+        self._summary = None
+
+    @classmethod
+    def from_connection(cls, connection):
+        """
+        Loads the columns and continent memberships of all countries.
+
+        Args:
+            connection (sqlite3.Connection): The connection to the country database.
+
+        Returns:
+            CountryAggregates: The loaded aggregates.
+        """
+        cursor = connection.cursor()
+        cursor.execute("SELECT id_country, official_name, area, population "
+                       "FROM Countries ORDER BY id_country")
+        countries = cursor.fetchall()
+        cursor.execute("SELECT id_continent, continent FROM Continents ORDER BY id_continent")
+        continents = cursor.fetchall()
+        cursor.execute("SELECT id_country, id_continent FROM Countries_Continents")
+        memberships = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 2)
+
+        country_ids = np.array([row[0] for row in countries], dtype=np.int64)
+        continent_ids = np.array([row[0] for row in continents], dtype=np.int64)
+        country_positions = np.searchsorted(country_ids, memberships[:, 0])
+        continent_positions = np.searchsorted(continent_ids, memberships[:, 1])
+        known = ((country_positions < len(country_ids))
+                 & (continent_positions < len(continent_ids)))
+        known[known] &= ((country_ids[country_positions[known]] == memberships[known, 0])
+                         & (continent_ids[continent_positions[known]] == memberships[known, 1]))
+        return cls(
+            [row[1] for row in countries],
+            [row[2] or 0 for row in countries],
+            [row[3] or 0 for row in countries],
+            [row[1] for row in continents],
+            country_positions[known],
+            continent_positions[known],
+            get_database_version(connection))
+
+    def _group(self, metric):
+        """
+        Returns the continent of every membership and the metric of its country,
+        restricted to memberships with a finite value.
+        """
+        values = self.values[metric][self.membership_countries]
+        finite = np.isfinite(values)
+        return self.membership_continents[finite], values[finite]
+
+    def _group_medians(self, metric):
+        """
+        Returns the median of a metric for every continent (NaN if it has no
+        finite values), selecting within the memberships grouped by continent.
+        """
+        values = self.values[metric][self._grouped_countries]
+        medians = np.full(len(self.continents), np.nan)
+        for index in range(len(self.continents)):
+            group = values[self._group_bounds[index]:self._group_bounds[index + 1]]
+            group = group[np.isfinite(group)]
+            if len(group):
+                medians[index] = np.median(group)
+        return medians
+
+    def continent_statistics(self, metric):
+        """
+        Returns the number of countries, total, mean and median of a metric for
+        every continent.
+
+        Args:
+            metric (str): 'area', 'population' or 'density'.
+
+        Returns:
+            dict: Arrays 'count', 'total', 'mean' and 'median', indexed like
+            self.continents.
+        """
+        groups, values = self._group(metric)
+        group_count = len(self.continents)
+        counts = np.bincount(groups, minlength=group_count)
+        totals = np.bincount(groups, weights=values, minlength=group_count)
+        means = np.full(group_count, np.nan)
+        np.divide(totals, counts, out=means, where=counts > 0)
+        return {
+            'count': counts,
+            'total': totals,
+            'mean': means,
+            'median': self._group_medians(metric),
+        }
+
+    def summary(self):
+        """
+        Returns the statistics of every continent, computed on first use.
+
+        Returns:
+            dict: Continent name -> the number of countries, the total area and
+            population, their ratio as the density of the continent, and the mean
+            and median of area, population and density. Missing values are None.
+        """
+        if self._summary is not None:
+            return self._summary
+        statistics = {metric: self.continent_statistics(metric) for metric in METRICS}
+        areas = statistics['area']['total']
+        populations = statistics['population']['total']
+        densities = np.full(len(self.continents), np.nan)
+        np.divide(populations, areas, out=densities, where=areas > 0)
+        summary = {}
+        for index, continent in enumerate(self.continents):
+            entry = {
+                'countries': int(statistics['area']['count'][index]),
+                'area': _json_number(areas[index]),
+                'population': _json_number(populations[index]),
+                'density': _json_number(densities[index]),
+            }
+            for metric in METRICS:
+                entry[f'mean_{metric}'] = _json_number(statistics[metric]['mean'][index])
+                entry[f'median_{metric}'] = _json_number(statistics[metric]['median'][index])
+            summary[continent] = entry
+        self._summary = summary
+        return summary
+
+    def top(self, metric, count=5, continent=None):
+        """
+        Returns the countries with the largest values of a metric.
+
+        Args:
+            metric (str): 'area', 'population' or 'density'.
+            count (int): The number of countries to return.
+            continent (str): Only consider countries on this continent.
+
+        Returns:
+            list: (country name, value) tuples ordered by descending value.
+
+        Raises:
+            KeyError: If the metric or continent is unknown.
+        """
+        values = self.values[metric]
+        if continent is None:
+            candidates = np.flatnonzero(np.isfinite(values))
+        else:
+            members = self.membership_countries[
+                self.membership_continents == self.continent_indexes[continent]]
+            candidates = members[np.isfinite(values[members])]
+        count = min(count, len(candidates))
+        if count <= 0:
+            return []
+        best = candidates[np.argpartition(-values[candidates], count - 1)[:count]]
+        best = best[np.argsort(-values[best], kind='stable')]
+        return [(self.names[index], _json_number(values[index])) for index in best]
+
+
+def _json_number(value):
+    """
+    Converts a NumPy number to an int or float for JSON, and NaN to None.
+    """
+    if np.isnan(value):
+        return None
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+_aggregates = FileStampCache(CountryAggregates.from_connection, 'countries')
+
+
+def get_country_aggregates(database_path):
+    """
+    Returns the aggregates of the given database, loading them on first use
+    and again whenever the database file has been replaced or modified.
+
+    Args:
+        database_path (str): The path to the country database.
+
+    Returns:
+        CountryAggregates: The cached aggregates.
+    """
+    return _aggregates.get(database_path)
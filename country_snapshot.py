@@ -0,0 +1,175 @@
+"""
+Holds an in-memory snapshot of every country in the country database so the quiz
+routes can pick options without querying SQLite on every request.
+"""
+import bisect
+import random
+
+from country import Country
+from database_operations.connection_pool import FileStampCache
+from database_operations.countries_database_operations import get_countries_by_ids
+
+
+class AttributeIndex:
+    """
+    Groups countries by the value of one attribute so that countries with
+    pairwise different values can be drawn without rejection sampling.
+
+    The countries with a valid value are stored contiguously per value, and
+    each value maps to its (start, end) range in that array.
+    """
+
+    def __init__(self, countries, key, is_valid=None):
+        self.key = key
+        groups = {}
+        for country in countries:
+            value = key(country)
+            if is_valid is None or is_valid(value):
+                groups.setdefault(value, []).append(country)
+        self.countries = []
+        self.ranges = {}
+        for value, members in groups.items():
+            start = len(self.countries)
+            self.countries.extend(members)
+            self.ranges[value] = (start, len(self.countries))
+
+    def sample_distinct(self, count):
+        """
+        Returns countries whose attribute values are pairwise different.
+
+        Every draw picks uniformly among the countries whose value has not been
+        drawn yet by skipping the ranges of the values already taken, so this
+        takes exactly count steps.
+
+        Args:
+            count (int): The number of countries to return.
+
+        Returns:
+            list: A list of Country objects.
+
+        Raises:
+            ValueError: If there are fewer than count different values.
+        """
+        if count > len(self.ranges):
+            raise ValueError(
+                f"Cannot draw {count} different values from {len(self.ranges)}")
+        chosen = []
+        excluded = []
+        remaining = len(self.countries)
+        for _ in range(count):
+            position = random.randrange(remaining)
+            for start, end in excluded:
+                if position < start:
+                    break
+                position += end - start
+            country = self.countries[position]
+            start, end = self.ranges[self.key(country)]
+            bisect.insort(excluded, (start, end))
+            remaining -= end - start
+            chosen.append(country)
+        return chosen
+
+
+class CountrySnapshot:
+    """
+    An immutable, fully hydrated list of Country objects plus a lookup of the
+    countries that belong to each continent and an AttributeIndex per quiz type.
+    """
+
+    def __init__(self, countries):
+        self.countries = list(countries)
+        self.by_continent = {}
+        for country in self.countries:
+            for continent in country.continent:
+                self.by_continent.setdefault(continent, []).append(country)
+        self.continents = list(self.by_continent)
+        self.indexes = {
+            'capital': AttributeIndex(self.countries, lambda c: tuple(c.capital)),
+            'population': AttributeIndex(self.countries, lambda c: c.population),
+            'area': AttributeIndex(self.countries, lambda c: c.area),
+            'currency': AttributeIndex(self.countries, lambda c: c.currency,
+                                       lambda value: value != 'None'),
+        }
+
+    @classmethod
+    def from_connection(cls, connection):
+        """
+        Builds a snapshot by hydrating all countries in a few batched queries.
+
+        Args:
+            connection (sqlite3.Connection): The connection to the country database.
+
+        Returns:
+            CountrySnapshot: The loaded snapshot.
+        """
+        cursor = connection.cursor()
+        cursor.execute("SELECT id_country FROM Countries ORDER BY id_country")
+        ids = [row[0] for row in cursor.fetchall()]
+        return cls(get_countries_by_ids(connection, ids))
+
+    def get_random_countries(self, count=3):
+        """
+        Returns randomly chosen countries that all have different capitals.
+
+        Args:
+            count (int): The number of countries to return.
+
+        Returns:
+            list: A list of Country objects.
+        """
+        return self.indexes['capital'].sample_distinct(count)
+
+    def get_countries_with_distinct(self, attribute, count=3):
+        """
+        Returns randomly chosen countries whose given attribute values all differ.
+
+        Args:
+            attribute (str): One of 'capital', 'population', 'area' or 'currency'.
+            count (int): The number of countries to return.
+
+        Returns:
+            list: A list of Country objects.
+        """
+        return self.indexes[attribute].sample_distinct(count)
+
+    def get_random_country_for_continent(self, continent):
+        """
+        Returns a random country of the given continent, with the continent
+        attribute set to that continent's name.
+
+        Args:
+            continent (str): The name of the continent.
+
+        Returns:
+            Country: A Country object located on the continent.
+        """
+        country = random.choice(self.by_continent[continent])
+        return Country(country.official_name, country.capital, continent,
+                       country.borders, country.population, country.area,
+                       country.languages, country.currency)
+
+    def get_three_different_continents(self):
+        """
+        Returns the names of three different random continents.
+
+        Returns:
+            list: A list of three continent names.
+        """
+        return random.sample(self.continents, 3)
+
+
+_snapshots = FileStampCache(CountrySnapshot.from_connection, 'countries')
+
+
+def get_country_snapshot(database_path):
+    """
+    Returns the snapshot for the given database, loading it on first use and
+    reloading it whenever the database file has been replaced or modified.
+
+    Args:
+        database_path (str): The path to the country database.
+
+    Returns:
+        CountrySnapshot: The cached snapshot.
+    """
+    return _snapshots.get(database_path)
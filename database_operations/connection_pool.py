@@ -0,0 +1,247 @@
+"""
+This module provides a bounded pool of reusable SQLite connections so that
+requests do not open (and leak) a new connection every time.
+"""
+import os
+import sqlite3
+import threading
+
+from database_operations.database_config import connect
+
+
+def database_file_stamp(path):
+    """
+    Returns a value that changes whenever the database file is replaced or modified.
+
+    Args:
+        path (str): The path to the database file.
+
+    Returns:
+        tuple or None: The inode, modification time and size of the file,
+        or None if the file does not exist.
+    """
+    try:
+        status = os.stat(path)
+    except OSError:
+        return None
+    return (status.st_ino, status.st_mtime_ns, status.st_size)
+
+
+def connection_file_stamp(connection):
+    """
+    Returns the database_file_stamp() of the main database of a connection.
+
+    Args:
+        connection (sqlite3.Connection): The connection.
+
+    Returns:
+        tuple or None: The stamp, or None if the database has no file (e.g. an
+        in-memory database) or its path could not be read.
+    """
+    try:
+        path = connection.execute("PRAGMA database_list").fetchone()[2]
+    except sqlite3.Error as e:
+        print("SQLite Error:", e)
+        return None
+    return database_file_stamp(path) if path else None
+
+
+class FileStampCache:
+    """
+    Keeps one value per database file, computed from a read-only connection on
+    first use and again whenever the database_file_stamp() of the file changes,
+    i.e. the file has been replaced or modified.
+
+    load computes the value from a sqlite3.Connection that is opened with the
+    settings of database ('countries' or 'users'). Lookups of an up-to-date
+    value only stat the file; loads are serialized so that concurrent callers
+    do not compute the same value twice.
+    """
+
+    def __init__(self, load, database):
+        self.load = load
+        self.database = database
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, database_path):
+        """
+        Returns the value for the given database file.
+
+        Args:
+            database_path (str): The path to the database file.
+
+        Returns:
+            The cached value.
+        """
+        stamp = database_file_stamp(database_path)
+        cached = self._entries.get(database_path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        with self._lock:
+            cached = self._entries.get(database_path)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+            connection = connect(database_path, self.database, read_only=True)
+            try:
+                value = self.load(connection)
+            finally:
+                connection.close()
+            self._entries[database_path] = (stamp, value)
+        return value
+
+
+class ConnectionPool:
+    """
+    A thread-safe, bounded pool of SQLite connections to a single database file.
+
+    Connections are opened lazily up to max_size. When all of them are in use,
+    acquire() waits until one is released and counts the wait in the pool stats.
+
+    With reopen_on_change, the pool notices when the database file has been
+    replaced (e.g. by an atomic swap after a rebuild) and closes the connections
+    to the old file instead of handing them out again.
+
+    Every connection is opened with database_config.connect and the settings
+    of the given database ('countries' or 'users').
+    """
+
+    def __init__(self, database, settings, max_size=5, read_only=False, timeout=30.0,
+                 reopen_on_change=False):
+        self.database = database
+        self.settings = settings
+        self.max_size = max_size
+        self.read_only = read_only
+        self.timeout = timeout
+        self.reopen_on_change = reopen_on_change
+        self._idle = []
+        self._in_use = 0
+        self._condition = threading.Condition()
+        self._stats = {'opened': 0, 'closed': 0, 'waits': 0, 'reopens': 0}
+        self._stamp = database_file_stamp(database) if reopen_on_change else None
+        self._generation = 0
+        self._generations = {}
+
+    def _connect(self):
+        """
+        Opens a new connection, in read-only mode if the pool is read-only,
+        with the settings of the pool's database.
+
+        Returns:
+            sqlite3.Connection: The new connection.
+        """
+        return connect(self.database, self.settings, read_only=self.read_only,
+                       check_same_thread=False)
+
+    def acquire(self):
+        """
+        Returns an idle connection, opening one if the pool is not yet full.
+
+        Returns:
+            sqlite3.Connection: A connection reserved for the caller.
+
+        Raises:
+            TimeoutError: If no connection became available within the timeout.
+        """
+        with self._condition:
+            if self.reopen_on_change:
+                self._check_for_new_file()
+            if not self._idle and self._in_use >= self.max_size:
+                self._stats['waits'] += 1
+                if not self._condition.wait_for(
+                        lambda: self._idle or self._in_use < self.max_size,
+                        timeout=self.timeout):
+                    raise TimeoutError(
+                        f"No connection to {self.database} available")
+            self._in_use += 1
+            if self._idle:
+                return self._idle.pop()
+        try:
+            connection = self._connect()
+        except sqlite3.Error:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._stats['opened'] += 1
+            self._generations[id(connection)] = self._generation
+        return connection
+
+    def _check_for_new_file(self):
+        """
+        Closes the idle connections if the database file has changed since they
+        were opened. Must be called with the condition held.
+        """
+        stamp = database_file_stamp(self.database)
+        if stamp == self._stamp:
+            return
+        self._stamp = stamp
+        self._generation += 1
+        self._stats['reopens'] += 1
+        while self._idle:
+            self._close(self._idle.pop())
+
+    def _close(self, connection):
+        """
+        Closes a connection of the pool. Must be called with the condition held.
+        """
+        self._generations.pop(id(connection), None)
+        connection.close()
+        self._stats['closed'] += 1
+
+    def release(self, connection):
+        """
+        Returns a connection to the pool, rolling back any open transaction.
+
+        Args:
+            connection (sqlite3.Connection): A connection obtained from acquire().
+
+        Returns:
+            None
+        """
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+        except sqlite3.Error as e:
+            print("SQLite Error:", e)
+            with self._condition:
+                self._generations.pop(id(connection), None)
+            connection.close()
+            connection = None
+        with self._condition:
+            self._in_use -= 1
+            if connection is None:
+                self._stats['closed'] += 1
+            elif self._generations.get(id(connection)) != self._generation:
+                self._close(connection)
+            else:
+                self._idle.append(connection)
+            self._condition.notify()
+
+    def close_all(self):
+        """
+        Closes every idle connection in the pool.
+
+        Returns:
+            None
+        """
+        with self._condition:
+            while self._idle:
+                self._close(self._idle.pop())
+
+    def stats(self):
+        """
+        Returns counters describing the current state of the pool.
+
+        Returns:
+            dict: The pool size, connections in use and idle, and the number of
+            waits, opened and closed connections so far.
+        """
+        with self._condition:
+            return {
+                'max_size': self.max_size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                **self._stats,
+            }
@@ -4,39 +4,74 @@ It includes functions to create a new database and table,
 and to insert a new user into the 'user' table.
 """
 
+import json
 import sqlite3
-import random
 from country import Country
 
-
-def insert_countries_data_to_db(connection, country_data, index):
-    """
-    Creates a table in the specified database and inserts country data into it.
-
-    Args:
-        database_name (str): The name of the database.
-        country_data (dict): A dictionary containing the country data.
-
-    Returns:
-        None
-    """
-
-    try:
-        insert_query = '''
-        INSERT OR IGNORE INTO Countries (id_country,official_name, code, area, population)
-        VALUES (?,?, ?, ?, ?)
-        '''
-        c = connection.cursor()
-        c.execute(insert_query, (
-            index,
-            country_data['name'],
-            country_data['code'],
-            country_data['area'],
-            country_data['population']
-        ))
-        connection.commit()
-    except sqlite3.Error as e:
-        print("SQLite Error:", e)
+# Upper bound for the number of ids bound into a single IN (...) clause.
+MAX_IDS_PER_QUERY = 900
+
+# Per-continent aggregates over the countries, as stored in 'ContinentStats'.
+CONTINENT_STATS_QUERY = '''
+SELECT Continents.id_continent, Continents.continent,
+       COUNT(Countries.id_country),
+       SUM(Countries.area), AVG(Countries.area),
+       SUM(Countries.population), AVG(Countries.population),
+       SUM(Countries.population) * 1.0 / NULLIF(SUM(Countries.area), 0)
+FROM Continents
+JOIN Countries_Continents ON Continents.id_continent = Countries_Continents.id_continent
+JOIN Countries ON Countries_Continents.id_country = Countries.id_country
+GROUP BY Continents.id_continent
+'''
+CONTINENT_STATS_COLUMNS = (
+    'country_count', 'total_area', 'mean_area', 'total_population', 'mean_population', 'density')
+
+# One row per country with its multi-valued attributes as JSON arrays, as
+# stored in 'CountryFacts'. Currencies are [name, symbol] pairs. Each junction
+# table is aggregated once, grouped by country, so building the table takes
+# linear time however many countries there are.
+COUNTRY_FACTS_QUERY = '''
+SELECT Countries.id_country AS id_country, Countries.official_name, Countries.code,
+       Countries.area, Countries.population,
+       IFNULL(Capitals.value, '[]'), IFNULL(Continents.value, '[]'),
+       IFNULL(Borders.value, '[]'), IFNULL(Languages.value, '[]'),
+       IFNULL(Currencies.value, '[]')
+FROM Countries
+LEFT JOIN (
+    SELECT Countries_Capitals.id_country, json_group_array(Capitals.capital) AS value
+    FROM Countries_Capitals
+    JOIN Capitals ON Countries_Capitals.id_capital = Capitals.id_capital
+    GROUP BY Countries_Capitals.id_country
+) AS Capitals ON Capitals.id_country = Countries.id_country
+LEFT JOIN (
+    SELECT Countries_Continents.id_country, json_group_array(Continents.continent) AS value
+    FROM Countries_Continents
+    JOIN Continents ON Countries_Continents.id_continent = Continents.id_continent
+    GROUP BY Countries_Continents.id_country
+) AS Continents ON Continents.id_country = Countries.id_country
+LEFT JOIN (
+    SELECT Countries_Borders.id_country, json_group_array(Borders.country_code_short) AS value
+    FROM Countries_Borders
+    JOIN Borders ON Countries_Borders.id_border = Borders.id_border
+    GROUP BY Countries_Borders.id_country
+) AS Borders ON Borders.id_country = Countries.id_country
+LEFT JOIN (
+    SELECT Countries_Languages.id_country, json_group_array(Languages.language) AS value
+    FROM Countries_Languages
+    JOIN Languages ON Countries_Languages.id_language = Languages.id_language
+    GROUP BY Countries_Languages.id_country
+) AS Languages ON Languages.id_country = Countries.id_country
+LEFT JOIN (
+    SELECT Countries_Currencies.id_country,
+           json_group_array(json_array(Currencies.name, Currencies.symbol)) AS value
+    FROM Countries_Currencies
+    JOIN Currencies ON Countries_Currencies.id_currency = Currencies.id_currency
+    GROUP BY Countries_Currencies.id_country
+) AS Currencies ON Currencies.id_country = Countries.id_country
+'''
+COUNTRY_FACTS_COLUMNS = (
+    'id_country', 'official_name', 'code', 'area', 'population',
+    'capitals', 'continents', 'borders', 'languages', 'currencies')
 
 
 def get_countries_count(connection):
@@ -60,523 +95,70 @@ def get_countries_count(connection):
         return -1  # Return a default value or raise an exception to handle errors
 
 
-
-def insert_into_zwischentabelle(connection, country_id, second_id, query):
-    """
-    Inserts data into the Zwischentabelle table in the countries.db database.
-    """
-    cursor = connection.cursor()
-    try:
-        for sec_id in second_id:
-            cursor.execute(query, (country_id, sec_id))
-            connection.commit()
-    except sqlite3.Error as e:
-        print("SQLite Error: ", e)
-
-
-##########################################################################
-# The following functions are used to insert data into the database.
-
-def insert_country_data_language(connection, data):
-    """
-    Inserts language data into the database and returns a list of language IDs.
-
-    Args:
-        connection: The SQLite database connection object.
-        data: A dictionary containing language data.
-
-    Returns:
-        A list of language IDs corresponding to the inserted data.
-
-    Raises:
-        sqlite3.Error: If there is an error executing the SQLite queries.
-    """
-    c = connection.cursor()
-    list_id = []
-    try:
-        for _, language in data.items():
-            language_query = "SELECT id_language FROM Languages WHERE language = ?"
-            c.execute(language_query, (language,))
-            result = c.fetchone()
-            if result is not None:
-                language_id = result[0]
-            else:
-                insert_query = "INSERT OR IGNORE INTO Languages (language) VALUES (?)"
-                c.execute(insert_query, (language,))
-                language_id = c.lastrowid
-            list_id.append(language_id)
-        connection.commit()
-    except sqlite3.Error as e:
-        print("SQLite Error:", e)
-    return list_id
-
-
-def insert_country_data_capital(connection, capitals):
-    """
-    Inserts capital data into the database and returns a list of capital IDs.
-
-    Args:
-        connection (sqlite3.Connection): The connection object to the SQLite database.
-        capitals (list): A list of capital names to be inserted into the database.
-
-    Returns:
-        list: A list of capital IDs corresponding to the inserted capitals.
-    """
-    c = connection.cursor()
-    list_id = []
-    try:
-        for capital in capitals:
-            capital_query = "SELECT id_capital FROM Capitals WHERE capital = ?"
-            c.execute(capital_query, (capital,))
-            result = c.fetchone()
-            if result is not None:
-                capital_id = result[0]
-            else:
-                insert_query = "INSERT OR IGNORE INTO Capitals (capital) VALUES (?)"
-                c.execute(insert_query, (capital,))
-                capital_id = c.lastrowid
-            list_id.append(capital_id)
-        connection.commit()
-    except sqlite3.Error as e:
-        print("SQLite Error:", e)
-    return list_id
-
-
-def insert_country_data_continent(connection, data):
-    """
-    Inserts country data into the Continents table in the database.
-
-    Args:
-        connection: The SQLite database connection object.
-        data: A list of continents.
-
-    Returns:
-        A list of continent IDs that were inserted or already existed in the database.
-    """
-    c = connection.cursor()
-    list_id = []
-    try:
-        for continent in data:
-            continent_query = "SELECT id_continent FROM Continents WHERE continent = ?"
-            c.execute(continent_query, (continent,))
-            result = c.fetchone()
-            if result is not None:
-                continent_id = result[0]
-            else:
-                insert_query = "INSERT OR IGNORE INTO Continents (continent) VALUES (?)"
-                c.execute(insert_query, (continent,))
-                continent_id = c.lastrowid
-            list_id.append(continent_id)
-        connection.commit()
-    except sqlite3.Error as e:
-        print("SQLite Error:", e)
-    return list_id
-
-
-def insert_country_data_borders(connection, borders):
-    """
-    Inserts country border data into the database.
-
-    Args:
-        connection (sqlite3.Connection): The connection object to the SQLite database.
-        borders (list): A list of country codes representing the borders.
-
-    Returns:
-        list: A list of border IDs that were inserted or already existed in the database.
-    """
-    c = connection.cursor()
-    list_id = []
-    try:
-        for border in borders:
-            border_query = "SELECT id_border FROM Borders WHERE country_code_short = ?"
-            c.execute(border_query, (border,))
-            result = c.fetchone()
-            if result is not None:
-                border_id = result[0]
-            else:
-                insert_query = "INSERT OR IGNORE INTO Borders (country_code_short) VALUES (?)"
-                c.execute(insert_query, (border,))
-                border_id = c.lastrowid
-            list_id.append(border_id)
-        connection.commit()
-    except sqlite3.Error as e:
-        print("SQLite Error:", e)
-    return list_id
-
-
-def insert_country_data_currencies(connection, currencies):
-    """
-    Inserts currency data into the Currencies table in the database.
-
-    Args:
-        connection (sqlite3.Connection): The connection object to the SQLite database.
-        currencies (dict): A dictionary containing currency data.
-
-    Returns:
-        list: A list of currency IDs that were inserted or retrieved from the database.
-    """
-    list_id = []
-    try:
-        for _, currency in currencies.items():
-            c = connection.cursor()
-            currency_query = "SELECT id_currency FROM Currencies WHERE name = ?"
-            c.execute(currency_query, (currency.get('name'),))
-            result = c.fetchone()
-            if result is not None:
-                currency_id = result[0]
-            else:
-                insert_query = "INSERT INTO Currencies (name, symbol) VALUES (?, ?)"
-                c.execute(insert_query, (currency.get(
-                    'name'), currency.get('symbol')))
-                currency_id = c.lastrowid
-            list_id.append(currency_id)
-        connection.commit()
-    except sqlite3.Error as e:
-        print("SQLite Error:", e)
-    return list_id
-
 ##########################################################################
 # The following functions are used to retrieve data from the database.
 
 
-def return_country_data_official_name(connection, country_id):
-    """
-    Returns the official name of a specific country ID in
-    the 'Countries' table of the SQLite database.
-
-    Args:
-        connection (sqlite3.Connection): The connection object to the SQLite database.
-        country_id (int): The ID of the country.
-
-    Returns:
-        str: The official name of the country.
-    """
-
-    cursor = connection.cursor()
-    try:
-        select_query = '''
-        SELECT official_name
-        FROM Countries
-        WHERE id_country = ?
-        '''
-        cursor.execute(select_query, (country_id,))
-        official_name = cursor.fetchone()[0]
-        if official_name:
-            return official_name
-        return "No official name"
-    except sqlite3.Error as e:
-        print("SQLite Error:", e)
-        return None
-
-
-def return_country_data_capital(connection, country_id):
-    """
-    Returns the capital data for a specific country ID
-    in the 'Countries' table of the SQLite database.
-
-    Args:
-        connection (sqlite3.Connection): The connection object to the SQLite database.
-        country_id (int): The ID of the country.
-
-    Returns:
-        list: A list of capital names.
-    """
-    cursor = connection.cursor()
-    try:
-        select_query = '''
-        SELECT Capitals.capital
-        FROM Countries
-        JOIN Countries_Capitals ON Countries.id_country = Countries_Capitals.id_country
-        JOIN Capitals ON Countries_Capitals.id_capital = Capitals.id_capital
-        WHERE Countries.id_country = ?
-        '''
-        cursor.execute(select_query, (country_id,))
-        rows = cursor.fetchall()
-        capitals = [row[0] for row in rows]
-        return capitals
-    except sqlite3.Error as e:
-        print("SQLite Error:", e)
-        return None
-
-def return_country_data_continent(connection, country_id):
-    """
-    Returns the continent data for a specific country ID
-    in the 'Countries' table of the SQLite database.
-
-    Args:
-        connection (sqlite3.Connection): The connection object to the SQLite database.
-        country_id (int): The ID of the country.
-
-    Returns:
-        list: A list of continent names.
-    """
-    cursor = connection.cursor()
-    try:
-        select_query = '''
-        SELECT Continents.continent
-        FROM Countries
-        JOIN Countries_Continents ON Countries.id_country = Countries_Continents.id_country
-        JOIN Continents ON Countries_Continents.id_continent = Continents.id_continent
-        WHERE Countries.id_country = ?
-        '''
-        cursor.execute(select_query, (country_id,))
-        rows = cursor.fetchall()
-        continents = [row[0] for row in rows]
-        return continents
-    except sqlite3.Error as e:
-        print("SQLite Error:", e)
-        return None
-
-def return_country_data_borders(connection, country_id):
-    """
-    Returns the border data for a specific country ID
-    in the 'Countries' table of the SQLite database.
-
-    Args:
-        connection (sqlite3.Connection): The connection object to the SQLite database.
-        country_id (int): The ID of the country.
-
-    Returns:
-        list: A list of border names.
+def get_countries_by_ids(connection, ids):
     """
-    cursor = connection.cursor()
-    try:
-        select_query = '''
-        SELECT Borders.country_code_short
-        FROM Countries
-        JOIN Countries_Borders ON Countries.id_country = Countries_Borders.id_country
-        JOIN Borders ON Countries_Borders.id_border = Borders.id_border
-        WHERE Countries.id_country = ?
-        '''
-        cursor.execute(select_query, (country_id,))
-        rows = cursor.fetchall()
-        borders = [row[0] for row in rows]
-        return borders
-    except sqlite3.Error as e:
-        print("SQLite Error:", e)
-        return None
+    Returns fully hydrated Country objects for the given country IDs.
 
-def return_country_data_population(connection, country_id):
-    """
-    Returns the population data for a specific country ID
-    in the 'Countries' table of the SQLite database.
+    The countries are read from the denormalized 'CountryFacts' table with one
+    primary key lookup per country. Databases built before that table existed
+    are aggregated from the junction tables instead.
 
     Args:
         connection (sqlite3.Connection): The connection object to the SQLite database.
-        country_id (int): The ID of the country.
+        ids (list): The IDs of the countries to load.
 
     Returns:
-        int: The population of the country.
+        list: A list of Country objects in the order of the given IDs.
+        IDs that do not exist are skipped.
     """
-    cursor = connection.cursor()
-    try:
-        select_query = '''
-        SELECT population
-        FROM Countries
-        WHERE id_country = ?
-        '''
-        cursor.execute(select_query, (country_id,))
-        population = cursor.fetchone()[0]
-        return population
-    except sqlite3.Error as e:
-        print("SQLite Error:", e)
-        return None
-
-def return_country_data_area(connection, country_id):
-    """
-    Returns the area data for a specific country ID in the 'Countries' table of the SQLite database.
-
-    Args:
-        connection (sqlite3.Connection): The connection object to the SQLite database.
-        country_id (int): The ID of the country.
-
-    Returns:
-        int: The area of the country.
-    """
-    cursor = connection.cursor()
-    try:
-        select_query = '''
-        SELECT area
-        FROM Countries
-        WHERE id_country = ?
-        '''
-        cursor.execute(select_query, (country_id,))
-        area = cursor.fetchone()[0]
-        return int(area)
-    except sqlite3.Error as e:
-        print("SQLite Error:", e)
-        return None
-
-def return_country_data_languages(connection, country_id):
-    """
-    Returns the language data for a specific country ID
-    in the 'Countries' table of the SQLite database.
-
-    Args:
-        connection (sqlite3.Connection): The connection object to the SQLite database.
-        country_id (int): The ID of the country.
-
-    Returns:
-        list: A list of language names.
-    """
-    cursor = connection.cursor()
-    try:
-        select_query = '''
-        SELECT Languages.language
-        FROM Countries
-        JOIN Countries_Languages ON Countries.id_country = Countries_Languages.id_country
-        JOIN Languages ON Countries_Languages.id_language = Languages.id_language
-        WHERE Countries.id_country = ?
-        '''
-        cursor.execute(select_query, (country_id,))
-        rows = cursor.fetchall()
-        languages = [row[0] for row in rows]
-        return languages
-    except sqlite3.Error as e:
-        print("SQLite Error:", e)
-        return []
-
-
-def return_country_data_currency(connection, country_id):
-    """
-    Returns the currency data for a specific country ID
-    in the 'Countries' table of the SQLite database.
-
-    Args:
-        connection (sqlite3.Connection): The connection object to the SQLite database.
-        country_id (int): The ID of the country.
-
-    Returns:
-        list: A list of currency names.
-    """
-    cursor = connection.cursor()
-    try:
-        select_query = '''
-        SELECT Currencies.name, Currencies.symbol
-        FROM Countries
-        JOIN Countries_Currencies ON Countries.id_country = Countries_Currencies.id_country
-        JOIN Currencies ON Countries_Currencies.id_currency = Currencies.id_currency
-        WHERE Countries.id_country = ?
-        '''
-        cursor.execute(select_query, (country_id,))
-        rows = cursor.fetchall()
-        currencies = [{'name': row[0], 'symbol': row[1]} for row in rows]
-        currencies_string = ', '.join(
-            [f"{currency['name']} ({currency['symbol']})" for currency in currencies])
-        return currencies_string
-    except sqlite3.Error as e:
-        print("SQLite Error:", e)
-        return None
-
-
-def return_three_different_continents(connection):
-    """
-    Returns a list of three different continents from the Continents table in the database.
-
-    Args:
-        connection (sqlite3.Connection): The connection object to the SQLite database.
+    ids = list(ids)
+    if len(ids) > MAX_IDS_PER_QUERY:
+        countries = []
+        for start in range(0, len(ids), MAX_IDS_PER_QUERY):
+            countries.extend(get_countries_by_ids(
+                connection, ids[start:start + MAX_IDS_PER_QUERY]))
+        return countries
 
-    Returns:
-        list: A list of three different continent names.
-    """
+    placeholders = ', '.join('?' * len(ids))
     cursor = connection.cursor()
     try:
-        select_query = '''
-        SELECT id_continent
-        FROM Continents
-        ORDER BY RANDOM()
-        LIMIT 3
-        '''
-        cursor.execute(select_query)
-        rows = cursor.fetchall()
-        continents = [row[0] for row in rows]
-        return continents
+        try:
+            cursor.execute(
+                "SELECT " + ", ".join(COUNTRY_FACTS_COLUMNS) + " FROM CountryFacts"
+                f" WHERE id_country IN ({placeholders})", ids)
+        except sqlite3.OperationalError:
+            cursor.execute(
+                f"SELECT * FROM ({COUNTRY_FACTS_QUERY}) WHERE id_country IN ({placeholders})",
+                ids)
+        rows = {row[0]: row for row in cursor.fetchall()}
     except sqlite3.Error as e:
         print("SQLite Error:", e)
         return []
 
-##########################################################################
-
-
-def get_random_countries(connection):
-    """
-    Returns a list of randomly generated Country objects.
-
-    Parameters:
-    - connection: The database connection object.
-
-    Returns:
-    - countries: A list of Country objects.
-
-    """
     countries = []
-    for _ in range(3):
-        while True:
-            random_int = random.randint(0, get_countries_count(connection))
-            official_name = return_country_data_official_name(
-                connection, random_int)
-            capital = return_country_data_capital(connection, random_int)
-            continent = return_country_data_continent(
-                connection, random_int)
-            borders = return_country_data_borders(connection, random_int)
-            population = return_country_data_population(
-                connection, random_int)
-            area = return_country_data_area(connection, random_int)
-            languages = return_country_data_languages(
-                connection, random_int)
-            currency = return_country_data_currency(
-                connection, random_int)
-            country = Country(official_name, capital, continent,
-                              borders, population, area, languages, currency)
-            if capital not in [c.capital for c in countries]:
-                break
-        countries.append(country)
+    for country_id in ids:
+        if country_id not in rows:
+            continue
+        (_, official_name, _, area, population,
+         capitals, continents, borders, languages, currencies) = rows[country_id]
+        currencies_string = ', '.join(
+            [f"{name} ({symbol})" for name, symbol in json.loads(currencies)])
+        countries.append(Country(
+            official_name or "No official name",
+            json.loads(capitals),
+            json.loads(continents),
+            json.loads(borders),
+            population,
+            int(area),
+            json.loads(languages),
+            currencies_string))
     return countries
 
 
-def get_country_by_continent_id(connection, continent_id):
-    """
-    Returns a list of countries that belong to a specific continent.
-
-    Parameters:
-    - continent_id: The ID of the continent.
-
-    Returns:
-    - countries: A list of countries that belong to the specified continent.
-
-    """
-    try:
-        select_query = '''
-        SELECT Countries.id_country, Countries.official_name, Countries.code, Countries.area, Countries.population, Continents.continent
-        FROM Countries
-        JOIN Countries_Continents ON Countries.id_country = Countries_Continents.id_country
-        JOIN Continents ON Countries_Continents.id_continent = Continents.id_continent
-        WHERE Countries_Continents.id_continent = ?
-        ORDER BY RANDOM()
-        '''
-        cursor = connection.cursor()
-        cursor.execute(select_query, (continent_id,))
-        result = cursor.fetchone()
-
-        borders = return_country_data_borders(connection, result[0])
-        capital = return_country_data_capital(connection, result[0])
-        languages = return_country_data_languages(connection, result[0])
-        currency = return_country_data_currency(connection, result[0])
-
-        return Country(
-            result[1],
-            capital,
-            result[5],
-            borders,
-            result[4],
-            result[3],
-            languages,
-            currency)
-    except sqlite3.Error as e:
-        print("SQLite Error:", e)
-        return None
-
-
 def get_top_five_largest_countries(connection):
     """
     Retrieves the top five largest countries from the database.
@@ -636,31 +218,65 @@ def get_top_five_population_countries(connection):
         return []
 
 
-def get_countries_by_continent(connection):
+def get_continent_stats(connection):
     """
-    Retrieve the count of countries grouped by continent from the database.
+    Retrieves the per-continent statistics that were computed when the database
+    was built. Databases built before the 'ContinentStats' table existed are
+    aggregated on the fly instead.
 
     Args:
         connection: The database connection object.
 
     Returns:
-        A dictionary where keys are continents and values are counts of countries in each continent.
+        A dictionary where keys are continents and values are dictionaries with the
+        country count, total and mean area and population, and the density.
     """
+    cursor = connection.cursor()
     try:
-        query = """
-        SELECT Continents.continent, COUNT(Countries.id_country) AS country_count
-        FROM Continents
-        JOIN Countries_Continents ON Continents.id_continent = Countries_Continents.id_continent
-        JOIN Countries ON Countries_Continents.id_country = Countries.id_country
-        GROUP BY Continents.continent
-        """
-        cursor = connection.cursor()
-        cursor.execute(query)
-        results = cursor.fetchall()
-        return dict(results)
+        try:
+            cursor.execute(
+                "SELECT id_continent, continent, " + ", ".join(CONTINENT_STATS_COLUMNS)
+                + " FROM ContinentStats ORDER BY continent")
+        except sqlite3.OperationalError:
+            cursor.execute(f"SELECT * FROM ({CONTINENT_STATS_QUERY}) ORDER BY 2")
+        return {row[1]: dict(zip(CONTINENT_STATS_COLUMNS, row[2:]))
+                for row in cursor.fetchall()}
     except sqlite3.Error as e:
         print("Error executing SQLite query:", e)
         return {}
+
+
+def get_database_version(connection):
+    """
+    Retrieves the version stamp of the country data written when the database was built.
+
+    Args:
+        connection: The database connection object.
+
+    Returns:
+        The version string, or None for databases built without a version stamp.
+    """
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT version FROM Build_Version WHERE id = 1")
+        result = cursor.fetchone()
+        return result[0] if result else None
+    except sqlite3.Error:
+        return None
+
+
+def get_countries_by_continent(connection):
+    """
+    Retrieve the count of countries grouped by continent from the database.
+
+    Args:
+        connection: The database connection object.
+
+    Returns:
+        A dictionary where keys are continents and values are counts of countries in each continent.
+    """
+    return {continent: stats['country_count']
+            for continent, stats in get_continent_stats(connection).items()}
  
 def get_continent_area_and_population_by_id(connection):
     """
@@ -670,7 +286,8 @@ def get_continent_area_and_population_by_id(connection):
         connection: The connection object to the SQLite database.
  
     Returns:
-        A list of density values calculated as population divided by area.
+        A list of density values calculated as population divided by area,
+        None for countries without an area.
     """
     try:
         select_query = '''
@@ -682,7 +299,7 @@ def get_continent_area_and_population_by_id(connection):
         result = cursor.fetchall()
         density_data = []
         for row in result:
-            density = row[1] / row[0]
+            density = row[1] / row[0] if row[0] else None
             density_data.append(density)
         return density_data
     except sqlite3.Error as e:
@@ -707,6 +324,26 @@ def get_all_areas(connection):
         print(f"Error retrieving areas: {e}")
         return []
 
+def get_all_areas_and_population(connection):
+    """
+    Retrieves the area and population of all countries from the 'Countries' table
+    in a single query, so that both lists are in the same order.
+
+    Args:
+        connection: The connection object to the SQLite database.
+
+    Returns:
+        A list of (area, population) tuples for all countries.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT area, population FROM Countries")
+        return cursor.fetchall()
+    except sqlite3.Error as e:
+        print(f"Error retrieving areas and population: {e}")
+        return []
+
+
 def get_all_population(connection):
     """
     Retrieves the population data for all countries from the 'Countries' table in the database.
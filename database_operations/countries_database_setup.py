@@ -1,106 +1,611 @@
 "This script creates the tables in the SQLite database for the countries project."
+import argparse
+import gzip
+import hashlib
+import json
+import os
 import sqlite3
+import tempfile
+import time
 import requests
+
 from database_operations.countries_database_operations import (
-    insert_countries_data_to_db,
-    insert_country_data_capital,
-    insert_country_data_continent,
-    insert_country_data_language,
-    insert_country_data_borders,
-    insert_country_data_currencies,
-    insert_into_zwischentabelle
-)
+    CONTINENT_STATS_QUERY, COUNTRY_FACTS_QUERY, MAX_IDS_PER_QUERY)
 
+# Number of countries buffered in memory before their rows are written.
+INSERT_BATCH_SIZE = 1000
+# Number of characters read from a dump file at a time.
+READ_CHUNK_SIZE = 64 * 1024
 
-def fetch_and_insert_data(connection):
+
+def parse_country(country):
     """
-    Fetches data from a REST API and inserts it into a database.
+    Extracts the values stored in the database from one restcountries record.
+
+    Missing capitals, continents, languages, borders and currencies are replaced
+    by the same placeholder values that the quiz pages expect.
+
+    Args:
+        country (dict): A country object as returned by the restcountries API.
+
+    Returns:
+        dict: The country row values and the lists of its attribute values.
+    """
+    capital = country.get('capital', {'noCapital': 'No Capital Found'})
+    continents = country.get('continents', {'noContinent': 'No Continent Found'})
+    languages = country.get('languages', {'noLang': 'No Language Found'})
+    borders = country.get('borders', {'island': 'Island'})
+    currencies = country.get(
+        'currencies', {
+            'NoCurr': {
+                'name': 'No currency', 'symbol': 'No symbol'}})
+    return {
+        'name': country['name']['official'],
+        'code': country['cca2'],
+        'area': country['area'],
+        'population': country['population'],
+        'capitals': list(capital),
+        'continents': list(continents),
+        'languages': list(languages.values()),
+        'borders': list(borders),
+        'currencies': [(currency.get('name'), currency.get('symbol'))
+                       for currency in currencies.values()],
+    }
+
+
+def hash_country(country_data):
+    """
+    Returns a fingerprint of the values stored for a country.
+
+    Args:
+        country_data (dict): The values returned by parse_country.
+
+    Returns:
+        str: The hex SHA-256 digest of the values.
+    """
+    encoded = json.dumps(country_data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class _LookupTable:
+    """
+    Assigns IDs to the distinct values of a lookup table such as 'Capitals'
+    and remembers which of them still have to be written.
+
+    Columns after the value (such as the symbol of a currency) are stored
+    along with it; if they change, the row is updated.
+    """
+
+    def __init__(self, connection, table, columns):
+        self.table = table
+        self.columns = columns
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT {', '.join(columns[1:])}, {columns[0]} FROM {table}")
+        self.ids = {}
+        self.extras = {}
+        for row in cursor.fetchall():
+            self.ids[row[0]] = row[-1]
+            self.extras[row[0]] = tuple(row[1:-1])
+        self.next_id = max(self.ids.values(), default=0) + 1
+        self.pending = []
+
+    def get_id(self, value, *extra):
+        """
+        Returns the ID of the value, registering it if it is new or its
+        extra columns changed.
+        """
+        value_id = self.ids.get(value)
+        if value_id is None:
+            value_id = self.ids[value] = self.next_id
+            self.next_id += 1
+            self.extras[value] = extra
+            self.pending.append((value_id, value, *extra))
+        elif self.extras[value] != extra:
+            self.extras[value] = extra
+            self.pending.append((value_id, value, *extra))
+        return value_id
+
+    def flush(self, cursor):
+        """
+        Writes the registered values to the lookup table.
+        """
+        if self.pending:
+            placeholders = ', '.join('?' * len(self.columns))
+            if len(self.columns) > 2:
+                updates = ', '.join(f"{column} = excluded.{column}"
+                                    for column in self.columns[2:])
+                query = (f"INSERT INTO {self.table} ({', '.join(self.columns)}) "
+                         f"VALUES ({placeholders}) "
+                         f"ON CONFLICT({self.columns[0]}) DO UPDATE SET {updates}")
+            else:
+                query = (f"INSERT OR IGNORE INTO {self.table} ({', '.join(self.columns)}) "
+                         f"VALUES ({placeholders})")
+            cursor.executemany(query, self.pending)
+            self.pending = []
+
+
+def _delete_countries(cursor, table, country_ids):
+    """
+    Deletes the rows of the given countries from a table, with one statement
+    per MAX_IDS_PER_QUERY countries, so that tables without an index on
+    id_country are scanned once per chunk instead of once per country.
+    """
+    country_ids = list(country_ids)
+    for start in range(0, len(country_ids), MAX_IDS_PER_QUERY):
+        chunk = country_ids[start:start + MAX_IDS_PER_QUERY]
+        cursor.execute(
+            f"DELETE FROM {table} WHERE id_country IN ({', '.join('?' * len(chunk))})",
+            chunk)
+
+
+class _CountryWriter:
+    """
+    Buffers the rows of countries, their junction tables and their hashes
+    and writes them with executemany.
+    """
+
+    JUNCTION_TABLES = {
+        'capitals': ('Countries_Capitals', 'id_capital'),
+        'continents': ('Countries_Continents', 'id_continent'),
+        'languages': ('Countries_Languages', 'id_language'),
+        'borders': ('Countries_Borders', 'id_border'),
+        'currencies': ('Countries_Currencies', 'id_currency'),
+    }
+
+    def __init__(self, connection):
+        self.cursor = connection.cursor()
+        self.lookups = {
+            'capitals': _LookupTable(connection, 'Capitals', ('id_capital', 'capital')),
+            'continents': _LookupTable(
+                connection, 'Continents', ('id_continent', 'continent')),
+            'languages': _LookupTable(connection, 'Languages', ('id_language', 'language')),
+            'borders': _LookupTable(
+                connection, 'Borders', ('id_border', 'country_code_short')),
+            'currencies': _LookupTable(
+                connection, 'Currencies', ('id_currency', 'name', 'symbol')),
+        }
+        self.country_rows = []
+        self.hash_rows = []
+        self.junction_rows = {attribute: [] for attribute in self.JUNCTION_TABLES}
+
+    def add(self, id_country, country_data, country_hash):
+        """
+        Buffers the rows of one country.
+        """
+        self.country_rows.append((id_country, country_data['name'], country_data['code'],
+                                  country_data['area'], country_data['population']))
+        self.hash_rows.append((country_data['code'], id_country, country_hash))
+        for attribute in ('capitals', 'continents', 'languages', 'borders'):
+            for value in country_data[attribute]:
+                self.junction_rows[attribute].append(
+                    (id_country, self.lookups[attribute].get_id(value)))
+        for name, symbol in country_data['currencies']:
+            self.junction_rows['currencies'].append(
+                (id_country, self.lookups['currencies'].get_id(name, symbol)))
+
+    def delete_junction_rows(self, country_ids):
+        """
+        Deletes the junction table rows of the given countries.
+        """
+        for table, _ in self.JUNCTION_TABLES.values():
+            _delete_countries(self.cursor, table, country_ids)
+
+    def flush(self, upsert=False):
+        """
+        Writes the buffered rows. With upsert, existing countries are updated
+        instead of being left untouched.
+        """
+        if upsert:
+            country_query = '''
+            INSERT INTO Countries (id_country,official_name, code, area, population)
+            VALUES (?,?, ?, ?, ?)
+            ON CONFLICT(id_country) DO UPDATE SET
+                official_name = excluded.official_name,
+                code = excluded.code,
+                area = excluded.area,
+                population = excluded.population
+            '''
+        else:
+            country_query = '''
+            INSERT OR IGNORE INTO Countries (id_country,official_name, code, area, population)
+            VALUES (?,?, ?, ?, ?)
+            '''
+        self.cursor.executemany(country_query, self.country_rows)
+        self.cursor.executemany(
+            "INSERT OR REPLACE INTO Country_Hashes (code, id_country, hash) VALUES (?,?,?)",
+            self.hash_rows)
+        self.country_rows.clear()
+        self.hash_rows.clear()
+        for attribute, (table, id_column) in self.JUNCTION_TABLES.items():
+            self.lookups[attribute].flush(self.cursor)
+            self.cursor.executemany(
+                f"INSERT INTO {table} (id_country,{id_column}) VALUES (?,?)",
+                self.junction_rows[attribute])
+            self.junction_rows[attribute].clear()
+
+
+def write_derived_tables(connection):
+    """
+    Rebuilds the tables derived from the country data: one denormalized row per
+    country in 'CountryFacts', the per-continent statistics in 'ContinentStats'
+    and the version stamp in 'Build_Version'.
+
+    The version is a hash of the hashes of all countries, so it only changes
+    when the data does. Must be called inside the transaction that wrote the
+    countries; the caller commits.
 
     Args:
         connection: The database connection object.
 
     Returns:
-        None
+        str: The version stamp of the data.
+    """
+    cursor = connection.cursor()
+    cursor.execute("DELETE FROM CountryFacts")
+    cursor.execute(f"INSERT INTO CountryFacts {COUNTRY_FACTS_QUERY}")
+    cursor.execute("DELETE FROM ContinentStats")
+    cursor.execute(f"INSERT INTO ContinentStats {CONTINENT_STATS_QUERY}")
+    digest = hashlib.sha256()
+    for code, country_hash in cursor.execute(
+            "SELECT code, hash FROM Country_Hashes ORDER BY code"):
+        digest.update(f"{code}:{country_hash}\n".encode('utf-8'))
+    version = digest.hexdigest()
+    cursor.execute(
+        "INSERT OR REPLACE INTO Build_Version (id, version, built_at) VALUES (1, ?, ?)",
+        (version, time.time()))
+    return version
+
+
+def _relaxed_durability(connection):
+    """
+    Turns off fsyncs for a bulk write and returns a function that restores them.
+    """
+    cursor = connection.cursor()
+    synchronous = cursor.execute("PRAGMA synchronous").fetchone()[0]
+    journal_mode = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+    cursor.execute("PRAGMA synchronous = OFF")
+    if journal_mode.lower() != 'wal':
+        cursor.execute("PRAGMA journal_mode = MEMORY").fetchall()
+
+    def restore():
+        cursor.execute(f"PRAGMA synchronous = {synchronous}")
+        if journal_mode.lower() != 'wal':
+            cursor.execute(f"PRAGMA journal_mode = {journal_mode}").fetchall()
+    return restore
+
+
+def bulk_insert_countries(connection, countries):
+    """
+    Inserts countries and their attributes in a single transaction.
+
+    Lookup values are deduplicated in memory and all rows are written with
+    executemany, in batches of INSERT_BATCH_SIZE countries. Durability is relaxed
+    while the build runs and restored afterwards.
+
+    Args:
+        connection: The database connection object.
+        countries (iterable): Country objects as returned by the restcountries API.
+
+    Returns:
+        int or None: The number of countries that were processed, or None if
+        the transaction failed and was rolled back.
+    """
+    restore_durability = _relaxed_durability(connection)
+    count = 0
+    try:
+        writer = _CountryWriter(connection)
+        for index, country in enumerate(countries, start=1):
+            try:
+                country_data = parse_country(country)
+            except (KeyError, TypeError, AttributeError) as e:
+                print("Error in loading:", repr(e))
+                continue
+            writer.add(index, country_data, hash_country(country_data))
+            count += 1
+            if len(writer.country_rows) >= INSERT_BATCH_SIZE:
+                writer.flush()
+        writer.flush()
+        write_derived_tables(connection)
+        connection.commit()
+    except sqlite3.Error as e:
+        print("SQLite Error:", e)
+        connection.rollback()
+        return None
+    finally:
+        restore_durability()
+    return count
+
+
+def refresh_countries(connection, countries):
+    """
+    Brings an existing database up to date with fresh country data, writing
+    only the countries whose data changed.
+
+    Every incoming country is matched with the stored one by its country code,
+    or else by its official name, and compared by hash. Countries that are no
+    longer present are deleted first, so their names can be reused; then new
+    and changed countries are upserted together with their junction table rows,
+    all in a single transaction. Only the new and changed countries are kept in
+    memory.
+
+    Args:
+        connection: The database connection object.
+        countries (iterable): Country objects as returned by the restcountries API.
+
+    Returns:
+        dict or None: The number of added, changed, removed and unchanged
+        countries, or None if the transaction failed and was rolled back.
+    """
+    create_tables_for_country_db(connection)
+    cursor = connection.cursor()
+    stored_ids = dict(cursor.execute("SELECT code, id_country FROM Countries"))
+    stored_names = dict(cursor.execute("SELECT official_name, id_country FROM Countries"))
+    stored_hashes = dict(cursor.execute("SELECT code, hash FROM Country_Hashes"))
+    next_id = cursor.execute(
+        "SELECT IFNULL(MAX(id_country), 0) + 1 FROM Countries").fetchone()[0]
+    report = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+
+    seen_codes = set()
+    updates = []
+    for country in countries:
+        try:
+            country_data = parse_country(country)
+        except (KeyError, TypeError, AttributeError) as e:
+            print("Error in loading:", repr(e))
+            continue
+        code = country_data['code']
+        seen_codes.add(code)
+        country_hash = hash_country(country_data)
+        if stored_hashes.get(code) == country_hash and code in stored_ids:
+            report['unchanged'] += 1
+        else:
+            updates.append((country_data, country_hash))
+
+    codes_by_id = {id_country: code for code, id_country in stored_ids.items()}
+    kept_ids = {stored_ids[code] for code in seen_codes if code in stored_ids}
+    changed = []
+    for country_data, country_hash in updates:
+        id_country = stored_ids.get(country_data['code'])
+        if id_country is None:
+            id_country = stored_names.get(country_data['name'])
+            if id_country is None or id_country in kept_ids:
+                id_country = next_id
+                next_id += 1
+                report['added'] += 1
+            else:
+                report['changed'] += 1
+            kept_ids.add(id_country)
+        else:
+            report['changed'] += 1
+        changed.append((id_country, country_data, country_hash))
+    removed_ids = [id_country for id_country in codes_by_id if id_country not in kept_ids]
+    changed_ids = [id_country for id_country, _, _ in changed]
+
+    restore_durability = _relaxed_durability(connection)
+    try:
+        writer = _CountryWriter(connection)
+        writer.delete_junction_rows(removed_ids)
+        _delete_countries(cursor, 'Countries', removed_ids)
+        _delete_countries(cursor, 'Country_Hashes', removed_ids)
+        report['removed'] = len(removed_ids)
+
+        writer.delete_junction_rows(changed_ids)
+        _delete_countries(cursor, 'Country_Hashes', changed_ids)
+        cursor.executemany("UPDATE Countries SET official_name = NULL WHERE id_country = ?",
+                           [(id_country,) for id_country in changed_ids])
+        for id_country, country_data, country_hash in changed:
+            writer.add(id_country, country_data, country_hash)
+            if len(writer.country_rows) >= INSERT_BATCH_SIZE:
+                writer.flush(upsert=True)
+        writer.flush(upsert=True)
+        write_derived_tables(connection)
+        connection.commit()
+    except sqlite3.Error as e:
+        print("SQLite Error:", e)
+        connection.rollback()
+        return None
+    finally:
+        restore_durability()
+    return report
+
+
+def fetch_countries():
+    """
+    Fetches all countries from the restcountries API.
+
+    Returns:
+        list or None: The country objects, or None if they could not be fetched.
     """
     try:
         response = requests.get(
             "https://restcountries.com/v3.1/all",
             timeout=200)
         if response.status_code == 200:
-            countries = response.json()
-            for index, country in enumerate(countries, start=1):
-                try:
-                    country_data = {
-                        'name': country['name']['official'],
-                        'code': country['cca2'],
-                        'area': country['area'],
-                        'population': country['population'],
-                    }
-                    insert_countries_data_to_db(
-                        connection, country_data, index)
-
-                    capital = country.get(
-                        'capital', {
-                            'noCapital': 'No Capital Found'})
-                    id_capital = insert_country_data_capital(
-                        connection, capital)
-
-                    continents = country.get(
-                        'continents', {
-                            'noContinent': 'No Continent Found'})
-                    id_continent = insert_country_data_continent(
-                        connection, continents)
-
-                    languages = country.get(
-                        'languages', {
-                            'noLang': 'No Language Found'})
-                    id_language = insert_country_data_language(
-                        connection, languages)
-
-                    borders = country.get('borders', {'island': 'Island'})
-                    id_border = insert_country_data_borders(
-                        connection, borders)
-
-                    currencies = country.get(
-                        'currencies', {
-                            'NoCurr': {
-                                'name': 'No currency', 'symbol': 'No symbol'}})
-                    id_currency = insert_country_data_currencies(
-                        connection, currencies)
-
-                    # Inserting into zwischentabelle
-                    insert_into_zwischentabelle(
-                        connection,
-                        index,
-                        id_border,
-                        '''INSERT INTO Countries_Borders (id_country,id_border) VALUES (?,?)''')
-                    insert_into_zwischentabelle(
-                        connection,
-                        index,
-                        id_capital,
-                        '''INSERT INTO Countries_Capitals (id_country,id_capital) VALUES (?,?)''')
-                    insert_into_zwischentabelle(
-                        connection,
-                        index,
-                        id_currency,
-                        '''INSERT INTO Countries_Currencies (id_country,id_currency) VALUES (?,?)''')
-                    insert_into_zwischentabelle(
-                        connection,
-                        index,
-                        id_language,
-                        '''INSERT INTO Countries_Languages (id_country,id_language) VALUES (?,?)''')
-                    insert_into_zwischentabelle(
-                        connection,
-                        index,
-                        id_continent,
-                        '''INSERT INTO Countries_Continents (id_country,id_continent) VALUES (?,?)''')
-                except requests.exceptions.RequestException as e:
-                    print("Error in loading:", str(e))
-                    continue
-        else:
-            print("Error in fetching data!")
+            return response.json()
+        print("Error in fetching data!")
     except requests.exceptions.RequestException as e:
         print("Error in fetching data:", str(e))
+    return None
+
+
+def fetch_and_insert_data(connection):
+    """
+    Fetches data from a REST API and inserts it into a database.
+
+    Args:
+        connection: The database connection object.
+
+    Returns:
+        None
+    """
+    countries = fetch_countries()
+    if countries is not None:
+        bulk_insert_countries(connection, countries)
+
+
+def iter_countries_from_file(path):
+    """
+    Yields the country objects of a restcountries dump one at a time.
+
+    The file may contain a JSON array or newline-delimited JSON objects and may
+    be gzip-compressed. Only the current object and one chunk of the file are
+    held in memory.
+
+    Args:
+        path (str): The path to the dump file.
+
+    Yields:
+        dict: One country object.
+    """
+    with open(path, 'rb') as file:
+        compressed = file.read(2) == b'\x1f\x8b'
+    opener = gzip.open if compressed else open
+    decoder = json.JSONDecoder()
+    with opener(path, 'rt', encoding='utf-8') as file:
+        buffer = ''
+        position = 0
+        started = False
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position == len(buffer):
+                buffer = file.read(READ_CHUNK_SIZE)
+                position = 0
+                if not buffer:
+                    return
+                continue
+            if buffer[position] == '[' and not started:
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            started = True
+            try:
+                country, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                chunk = file.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    raise
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield country
+
+
+def load_from_file(connection, path):
+    """
+    Inserts the countries of a local restcountries dump into a database.
+
+    Args:
+        connection: The database connection object.
+        path (str): The path to a JSON, gzip JSON or NDJSON dump file.
+
+    Returns:
+        int or None: The number of countries that were processed, or None if
+        they could not be written.
+    """
+    return bulk_insert_countries(connection, iter_countries_from_file(path))
+
+
+def validate_country_database(connection):
+    """
+    Checks that a freshly built country database is complete and not corrupted.
+
+    Args:
+        connection: The connection to the built database.
+
+    Returns:
+        list: A description of every problem found, empty if the database is valid.
+    """
+    problems = []
+    cursor = connection.cursor()
+    try:
+        integrity = cursor.execute("PRAGMA integrity_check").fetchone()[0]
+        if integrity != 'ok':
+            problems.append(f"integrity check failed: {integrity}")
+        if cursor.execute("SELECT COUNT(*) FROM Countries").fetchone()[0] == 0:
+            problems.append("no countries")
+        for table in ('Countries_Capitals', 'Countries_Continents', 'Countries_Currencies'):
+            missing = cursor.execute(f'''
+            SELECT COUNT(*) FROM Countries
+            WHERE id_country NOT IN (SELECT id_country FROM {table})
+            ''').fetchone()[0]
+            if missing:
+                problems.append(f"{missing} countries without rows in {table}")
+        facts = cursor.execute("SELECT COUNT(*) FROM CountryFacts").fetchone()[0]
+        countries = cursor.execute("SELECT COUNT(*) FROM Countries").fetchone()[0]
+        if facts != countries:
+            problems.append(f"{facts} rows in CountryFacts for {countries} countries")
+        if cursor.execute("SELECT COUNT(*) FROM ContinentStats").fetchone()[0] == 0:
+            problems.append("no continent statistics")
+        if cursor.execute("SELECT COUNT(*) FROM Build_Version").fetchone()[0] == 0:
+            problems.append("no version stamp")
+    except sqlite3.Error as e:
+        problems.append(f"SQLite Error: {e}")
+    return problems
+
+
+def build_country_database(path, countries, incremental=True):
+    """
+    Builds a new version of the country database and atomically swaps it into place.
+
+    The new version is written to a temporary file in the same directory, either
+    as a copy of the current database brought up to date with refresh_countries
+    or from scratch with bulk_insert_countries. It only replaces the database at
+    path if it was written without errors and passes validate_country_database,
+    so readers never see a half built or outdated database.
+
+    Args:
+        path (str): The path of the country database.
+        countries (iterable): Country objects as returned by the restcountries API.
+        incremental (bool): Whether to update a copy of the existing database
+            instead of building from scratch.
+
+    Returns:
+        dict or None: The number of added, changed, removed and unchanged countries,
+        or None if the new database could not be written or was invalid and the
+        old one was kept.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        prefix='.countries-', suffix='.db', dir=directory)
+    os.close(file_descriptor)
+    try:
+        connection = sqlite3.connect(temporary_path)
+        try:
+            if incremental and os.path.exists(path):
+                source = sqlite3.connect(path)
+                source.backup(connection)
+                source.close()
+                report = refresh_countries(connection, countries)
+            else:
+                create_tables_for_country_db(connection)
+                count = bulk_insert_countries(connection, countries)
+                report = None if count is None else {
+                    'added': count, 'changed': 0, 'removed': 0, 'unchanged': 0}
+            if report is None:
+                problems = ["the country data could not be written"]
+            else:
+                problems = validate_country_database(connection)
+        finally:
+            connection.close()
+        if problems:
+            print("Country database was not replaced:", "; ".join(problems))
+            os.remove(temporary_path)
+            return None
+        with open(temporary_path, 'rb+') as file:
+            os.fsync(file.fileno())
+        if os.path.exists(path):
+            os.chmod(temporary_path, os.stat(path).st_mode)
+        else:
+            os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+    return report
 
 
 def create_tables_for_country_db(connection):
@@ -198,6 +703,46 @@ def create_tables_for_country_db(connection):
             FOREIGN KEY (id_border) REFERENCES Borders(id_border),
             FOREIGN KEY (id_country) REFERENCES Countries(id)
         )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Country_Hashes (
+            code TEXT PRIMARY KEY,
+            id_country INTEGER,
+            hash TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS CountryFacts (
+            id_country INTEGER PRIMARY KEY,
+            official_name TEXT,
+            code TEXT,
+            area REAL,
+            population INTEGER,
+            capitals TEXT,
+            continents TEXT,
+            borders TEXT,
+            languages TEXT,
+            currencies TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS ContinentStats (
+            id_continent INTEGER PRIMARY KEY,
+            continent TEXT UNIQUE,
+            country_count INTEGER,
+            total_area REAL,
+            mean_area REAL,
+            total_population INTEGER,
+            mean_population REAL,
+            density REAL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Build_Version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version TEXT,
+            built_at REAL
+        )
         """
     ]
     for query in queries:
@@ -207,3 +752,37 @@ def create_tables_for_country_db(connection):
             connection.commit()
         except sqlite3.Error as e:
             print("Error executing query:", e)
+
+
+def main(argv=None):
+    """
+    Builds the country database from the restcountries API or a local dump.
+
+    Args:
+        argv (list): The command line arguments, defaults to sys.argv.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Build the country database.")
+    parser.add_argument('--database', default='database/countries.db',
+                        help="path of the SQLite database to build")
+    parser.add_argument('--from-file',
+                        help="restcountries dump (JSON, gzip JSON or NDJSON) "
+                             "to load instead of the live API")
+    parser.add_argument('--refresh', action='store_true',
+                        help="start from the current database and only write the "
+                             "countries that changed since the last build")
+    args = parser.parse_args(argv)
+
+    if args.from_file:
+        countries = iter_countries_from_file(args.from_file)
+    else:
+        countries = fetch_countries()
+    if countries is not None:
+        report = build_country_database(args.database, countries, incremental=args.refresh)
+        print("Built the country database:", report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+This module holds the SQLite settings of the two databases and applies them
+to every connection when it is opened.
+
+The user database is written on every finished game while the highscore and
+home pages read it, so it runs in WAL mode: readers no longer block on the
+score writer and a commit only has to sync the log. The country database is
+never written in place; it is rebuilt aside and swapped in with a rename, so
+it keeps its rollback journal (a WAL file left next to the old database would
+be replayed into the new one) and only gets read-side settings.
+
+Every setting can be overridden with an environment variable named after the
+database and the pragma, e.g. USER_DB_SYNCHRONOUS=FULL or COUNTRY_DB_MMAP_SIZE=0.
+An empty value leaves the SQLite default in place.
+"""
+import os
+import pathlib
+import sqlite3
+
+DATABASE_DEFAULTS = {
+    'countries': {
+        'journal_mode': None,
+        'synchronous': None,
+        'busy_timeout': 5000,
+        'mmap_size': 64 * 1024 * 1024,
+        'cache_size': -8192,
+    },
+    'users': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'mmap_size': 32 * 1024 * 1024,
+        'cache_size': -4096,
+    },
+}
+
+ENVIRONMENT_PREFIXES = {
+    'countries': 'COUNTRY_DB_',
+    'users': 'USER_DB_',
+}
+
+# Pragmas that change the database file and cannot be set on read-only connections.
+WRITE_PRAGMAS = ('journal_mode', 'synchronous')
+
+
+def get_database_config(database):
+    """
+    Returns the pragma settings of a database, with environment overrides applied.
+
+    Args:
+        database (str): 'countries' or 'users'.
+
+    Returns:
+        dict: The pragma names mapped to their values; None means "leave unset".
+    """
+    config = dict(DATABASE_DEFAULTS[database])
+    prefix = ENVIRONMENT_PREFIXES[database]
+    for pragma in config:
+        value = os.environ.get(prefix + pragma.upper())
+        if value is None:
+            continue
+        if not value:
+            config[pragma] = None
+        elif value.lstrip('-').isdigit():
+            config[pragma] = int(value)
+        else:
+            config[pragma] = value.upper()
+    return config
+
+
+def configure_connection(connection, config, read_only=False):
+    """
+    Applies the pragma settings to a freshly opened connection.
+
+    Args:
+        connection (sqlite3.Connection): The connection to configure.
+        config (dict): The settings as returned by get_database_config().
+        read_only (bool): Whether the connection was opened read-only, in which
+            case the journal mode and synchronous settings are skipped.
+
+    Returns:
+        sqlite3.Connection: The same connection.
+    """
+    for pragma, value in config.items():
+        if value is None or (read_only and pragma in WRITE_PRAGMAS):
+            continue
+        if isinstance(value, str) and not value.isalnum():
+            raise ValueError(f"Invalid value for {pragma}: {value!r}")
+        try:
+            connection.execute(f"PRAGMA {pragma} = {value}").fetchall()
+        except sqlite3.Error as e:
+            print("SQLite Error:", e)
+    return connection
+
+
+def connect(path, database, read_only=False, **kwargs):
+    """
+    Opens a connection with the settings of the given database.
+
+    Args:
+        path (str): The path to the database file.
+        database (str): 'countries' or 'users'.
+        read_only (bool): Whether to open the database in read-only URI mode,
+            which fails instead of creating the file if it does not exist.
+        **kwargs: Further arguments for sqlite3.connect().
+
+    Returns:
+        sqlite3.Connection: The configured connection.
+    """
+    if read_only:
+        uri = pathlib.Path(path).resolve().as_uri() + '?mode=ro'
+        connection = sqlite3.connect(uri, uri=True, **kwargs)
+    else:
+        connection = sqlite3.connect(path, **kwargs)
+    try:
+        return configure_connection(connection, get_database_config(database), read_only)
+    except ValueError:
+        connection.close()
+        raise
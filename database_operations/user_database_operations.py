@@ -3,9 +3,20 @@ It also contains functions to interact with the 'Users' table in the user databa
 import sqlite3
 from user import User
 
+# Schema migrations of the user database, applied in order. The number of
+# applied migrations is stored in PRAGMA user_version.
+USER_DB_MIGRATIONS = [
+    [
+        "CREATE INDEX IF NOT EXISTS idx_users_score ON Users (score DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_users_name ON Users (name)",
+    ],
+]
+
+
 def create_tables_for_user_db(connection):
     """
-    Creates the 'Users' table in the user database if it doesn't exist.
+    Creates the 'Users' table in the user database if it doesn't exist
+    and brings its schema up to date.
 
     Args:
         connection (sqlite3.Connection): The connection to the user database.
@@ -22,6 +33,30 @@ def create_tables_for_user_db(connection):
         c.execute(query)
     except sqlite3.Error as e:
         print("SQLite Error:", e)
+    migrate_user_db(connection)
+
+
+def migrate_user_db(connection):
+    """
+    Applies the migrations of USER_DB_MIGRATIONS that have not been applied yet.
+
+    Args:
+        connection (sqlite3.Connection): The connection to the user database.
+
+    Returns:
+        None
+    """
+    try:
+        c = connection.cursor()
+        version = c.execute("PRAGMA user_version").fetchone()[0]
+        for number, statements in enumerate(USER_DB_MIGRATIONS[version:], start=version + 1):
+            for statement in statements:
+                c.execute(statement)
+            c.execute(f"PRAGMA user_version = {number}")
+            connection.commit()
+    except sqlite3.Error as e:
+        print("SQLite Error:", e)
+        connection.rollback()
 
 
 def check_username_exists(connection, username):
@@ -37,7 +72,7 @@ def check_username_exists(connection, username):
     """
     try:
         c = connection.cursor()
-        c.execute("SELECT * FROM Users WHERE name = ?", (username,))
+        c.execute("SELECT 1 FROM Users WHERE name = ? LIMIT 1", (username,))
         result = c.fetchone()
         return result is not None
     except sqlite3.Error as e:
@@ -67,6 +102,28 @@ def set_user_score(connection, username, score):
         print("SQLite Error:", e)
 
 
+def set_user_scores(connection, scores):
+    """
+    Inserts the scores of several finished games with a single commit.
+
+    Args:
+        connection (sqlite3.Connection): The connection to the user database.
+        scores (list): A list of (username, score) tuples.
+
+    Returns:
+        bool: True if the scores were saved, False otherwise.
+    """
+    try:
+        c = connection.cursor()
+        c.executemany("INSERT INTO Users (name, score) VALUES (?, ?)", scores)
+        connection.commit()
+        return True
+    except sqlite3.Error as e:
+        print("SQLite Error:", e)
+        connection.rollback()
+        return False
+
+
 def get_score_by_username(connection, username):
     """
     Retrieves the score and rank for a user from the 'Users' table.
@@ -81,7 +138,7 @@ def get_score_by_username(connection, username):
     """
     try:
         c = connection.cursor()
-        c.execute("SELECT score FROM Users WHERE name = ?", (username,))
+        c.execute("SELECT score FROM Users WHERE name = ? LIMIT 1", (username,))
         result = c.fetchone()
         if result is not None:
             score = result[0]
@@ -125,6 +182,9 @@ def get_rank_for_username(connection, username):
     """
     Retrieves the rank of a user based on their score from the 'Users' table.
 
+    The user's score is looked up with the name index and the higher scores are
+    counted on the score index, so only the rows ranked above the user are read.
+
     Args:
         connection (sqlite3.Connection): The connection to the user database.
         username (str): The username of the user.
@@ -135,7 +195,8 @@ def get_rank_for_username(connection, username):
     try:
         c = connection.cursor()
         c.execute(
-            "SELECT COUNT(*) FROM Users WHERE score > (SELECT score FROM Users WHERE name = ?)",
+            "SELECT COUNT(*) FROM Users WHERE score > "
+            "(SELECT score FROM Users WHERE name = ? LIMIT 1)",
             (username,
              ))
         result = c.fetchone()
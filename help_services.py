@@ -3,10 +3,6 @@ This module contains helper functions for the quiz services.
 """
 import random
 
-from database_operations.countries_database_operations import (
-    get_country_by_continent_id,
-    get_random_countries, return_three_different_continents)
-
 
 def get_shuffled_country(
         first_option_country,
@@ -31,12 +27,15 @@ def get_shuffled_country(
     return countries[0]
 
 
-def get_random_quiz_data(country_connection, quiz_type):
+def get_random_quiz_data(country_snapshot, quiz_type):
     """
     Generate random quiz data based on the specified quiz type.
 
+    The three options are drawn from the snapshot's index for the quiz attribute,
+    so their values always differ and no retries are needed.
+
     Args:
-        country_connection: The connection to the country database.
+        country_snapshot (CountrySnapshot): The in-memory snapshot of the country database.
         quiz_type (str): The type of quiz to generate. Possible values are 'capital', 'population',
         'area', 'currency', or any other value for a general quiz.
 
@@ -44,37 +43,9 @@ def get_random_quiz_data(country_connection, quiz_type):
         tuple: A tuple containing the first option country, second option country,
         third option country, and the correct country for the quiz.
     """
-    random_countries = get_random_countries(country_connection)
-
-    while True:
-        first_option_country, second_option_country, third_option_country = random.sample(
-            random_countries, 3)
-
-        # Quiz-specific conditions
-        if quiz_type == 'capital':
-            condition_met = (first_option_country.capital != second_option_country.capital
-                             and second_option_country.capital != third_option_country.capital
-                             and first_option_country.capital != third_option_country.capital)
-        elif quiz_type == 'population':
-            condition_met = (first_option_country.population != second_option_country.population
-                             and second_option_country.population != third_option_country.population
-                             and first_option_country.population != third_option_country.population)
-        elif quiz_type == 'area':
-            condition_met = (first_option_country.area != second_option_country.area
-                             and second_option_country.area != third_option_country.area
-                             and first_option_country.area != third_option_country.area)
-        elif quiz_type == 'currency':
-            condition_met = (first_option_country.currency != second_option_country.currency
-                             and second_option_country.currency != third_option_country.currency
-                             and first_option_country.currency != third_option_country.currency
-                             and first_option_country.currency != 'None'
-                             and second_option_country.currency != 'None'
-                             and third_option_country.currency != 'None')
-        else:
-            condition_met = first_option_country != second_option_country != third_option_country
-
-        if condition_met:
-            break
+    attribute = quiz_type if quiz_type in country_snapshot.indexes else 'capital'
+    first_option_country, second_option_country, third_option_country = \
+        country_snapshot.get_countries_with_distinct(attribute)
 
     correct_country = get_shuffled_country(
         first_option_country,
@@ -83,23 +54,21 @@ def get_random_quiz_data(country_connection, quiz_type):
     return first_option_country, second_option_country, third_option_country, correct_country
 
 
-def return_options_for_continents(country_connection):
+def return_options_for_continents(country_snapshot):
     """
     Returns a tuple of three random country options and the correct country for a given continent.
 
     Parameters:
-    country_connection (Connection): The connection to the country database.
+    country_snapshot (CountrySnapshot): The in-memory snapshot of the country database.
 
     Returns:
     tuple: A tuple containing three random country options and the correct country.
     """
 
-    continents = return_three_different_continents(country_connection)
-    countries = list(map(lambda x: get_country_by_continent_id(
-        country_connection, x), continents))
+    continents = country_snapshot.get_three_different_continents()
+    countries = list(map(country_snapshot.get_random_country_for_continent, continents))
     correct_country = countries[0]
     first_option, second_option, third_option = random.sample(countries, 3)
-    get_country_by_continent_id(country_connection, first_option)
     return (first_option,
             second_option,
             third_option,
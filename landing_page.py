@@ -9,26 +9,189 @@ largest countries and the top five countries by population. The data for the qui
 and the country information is stored in a SQLite database.
 """
 
+import functools
 import os
 import re
 import sqlite3
+import threading
 import time
-import matplotlib
-from flask import Flask, redirect, render_template, request, session
+from flask import Flask, abort, g, jsonify, redirect, render_template, request, session, url_for
+from country_snapshot import get_country_snapshot
+from database_operations.connection_pool import ConnectionPool, database_file_stamp
+from database_operations.database_config import connect
 from database_operations.countries_database_setup import (
-    create_tables_for_country_db, fetch_and_insert_data)
+    build_country_database, fetch_countries, validate_country_database)
 from database_operations.user_database_operations import (
-    check_username_exists, create_tables_for_user_db, get_rank_for_username,
-    get_top_ten_score, set_user_score)
+    check_username_exists, create_tables_for_user_db)
 from help_services import get_random_quiz_data, return_options_for_continents
-from visual_helper import (
-    plot_top_five_largest_countries, plot_top_five_population_countries, hypothesis_test, get_correlation_coefficient)
-
-matplotlib.use('Agg')
+from leaderboard import get_leaderboard
+from question_pool import QuestionPool
+from refresh_scheduler import RefreshScheduler
 
 app = Flask(__name__, static_folder='static')
 app.secret_key = 'BAD_SECRET_KEY'
 
+COUNTRY_DB_PATH = "database/countries.db"
+USER_DB_PATH = "database/user.db"
+COUNTRY_DATA_MAX_AGE = int(os.environ.get('COUNTRY_DATA_MAX_AGE', 30 * 24 * 60 * 60))
+CHART_MAX_AGE = 365 * 24 * 60 * 60
+
+country_pool = ConnectionPool(
+    COUNTRY_DB_PATH,
+    'countries',
+    max_size=int(os.environ.get('COUNTRY_DB_POOL_SIZE', 5)),
+    read_only=True,
+    reopen_on_change=True)
+user_pool = ConnectionPool(
+    USER_DB_PATH,
+    'users',
+    max_size=int(os.environ.get('USER_DB_POOL_SIZE', 5)))
+
+
+def get_country_connection():
+    """
+    Returns the country database connection of the current app context,
+    taking one from the pool on first use.
+
+    Returns:
+        sqlite3.Connection: A read-only connection to the country database.
+    """
+    if 'country_connection' not in g:
+        g.country_connection = country_pool.acquire()
+    return g.country_connection
+
+
+def get_user_connection():
+    """
+    Returns the user database connection of the current app context,
+    taking one from the pool on first use.
+
+    Returns:
+        sqlite3.Connection: A connection to the user database.
+    """
+    if 'user_connection' not in g:
+        g.user_connection = user_pool.acquire()
+    return g.user_connection
+
+
+def generate_question(quiz_type):
+    """
+    Generates the options and the correct answer for one question.
+
+    Args:
+        quiz_type (str): One of 'capital', 'continent', 'population', 'area' or 'currency'.
+
+    Returns:
+        tuple: The three option countries and the correct country.
+    """
+    country_snapshot = get_country_snapshot(COUNTRY_DB_PATH)
+    if quiz_type == 'continent':
+        return return_options_for_continents(country_snapshot)
+    return get_random_quiz_data(country_snapshot, quiz_type)
+
+
+question_pools = {
+    quiz_type: QuestionPool(
+        functools.partial(generate_question, quiz_type),
+        max_size=int(os.environ.get('QUESTION_POOL_SIZE', 50)),
+        low_water_mark=int(os.environ.get('QUESTION_POOL_LOW_WATER_MARK', 10)),
+        version=functools.partial(database_file_stamp, COUNTRY_DB_PATH))
+    for quiz_type in ('capital', 'continent', 'population', 'area', 'currency')
+}
+
+
+def warm_up():
+    """
+    Imports the chart, statistics and aggregation modules and computes the
+    charts, statistics and aggregates of the current country data.
+
+    The modules pull in matplotlib, NumPy and SciPy, which only the
+    diagram and stats pages need, so they are imported here or on first use
+    instead of when the app is loaded.
+    """
+    # pylint: disable=import-outside-toplevel
+    from country_aggregates import get_country_aggregates
+    from statistics_service import get_area_population_statistics
+    from visual_helper import prerender_charts
+    prerender_charts(COUNTRY_DB_PATH)
+    get_area_population_statistics(COUNTRY_DB_PATH)
+    get_country_aggregates(COUNTRY_DB_PATH).summary()
+
+
+def get_country_database_problems():
+    """
+    Checks the country database that is currently in place.
+
+    Returns:
+        list: A description of every problem found, empty if the database exists
+        and passes validate_country_database.
+    """
+    if not os.path.exists(COUNTRY_DB_PATH):
+        return ["missing"]
+    try:
+        connection = connect(COUNTRY_DB_PATH, 'countries', read_only=True)
+    except sqlite3.Error as e:
+        return [f"SQLite Error: {e}"]
+    try:
+        return validate_country_database(connection)
+    finally:
+        connection.close()
+
+
+def refresh_country_data():
+    """
+    Rebuilds the country database from the restcountries API if it is missing,
+    invalid or older than COUNTRY_DATA_MAX_AGE seconds, and pre-computes its
+    charts and statistics. An invalid database, or one that could not be
+    refreshed incrementally, is rebuilt from scratch.
+
+    Returns:
+        dict or str: The refresh report, or 'fresh' if no refresh was needed.
+
+    Raises:
+        RuntimeError: If the data could not be fetched or the new database was invalid.
+    """
+    problems = get_country_database_problems()
+    if not problems and \
+            (time.time() - os.path.getmtime(COUNTRY_DB_PATH)) <= COUNTRY_DATA_MAX_AGE:
+        return 'fresh'
+    if problems:
+        print("Country database needs a full rebuild:", "; ".join(problems))
+    fetched_countries = fetch_countries()
+    if fetched_countries is None:
+        raise RuntimeError("Country data could not be fetched")
+    refresh_report = build_country_database(
+        COUNTRY_DB_PATH, fetched_countries, incremental=not problems)
+    if refresh_report is None and not problems:
+        print("Incremental refresh failed, rebuilding the country database from scratch")
+        refresh_report = build_country_database(
+            COUNTRY_DB_PATH, fetched_countries, incremental=False)
+    if refresh_report is None:
+        raise RuntimeError("The rebuilt country database was invalid")
+    print("Country data refreshed:", refresh_report)
+    warm_up()
+    return refresh_report
+
+
+refresh_scheduler = RefreshScheduler(
+    refresh_country_data,
+    interval=int(os.environ.get('COUNTRY_REFRESH_INTERVAL', 60 * 60)),
+    jitter=float(os.environ.get('COUNTRY_REFRESH_JITTER', 0.1)),
+    lock_path=COUNTRY_DB_PATH + '.lock')
+
+
+@app.teardown_appcontext
+def release_connections(exception):
+    """
+    Returns the connections used by the current app context to their pools.
+    """
+    country_connection = g.pop('country_connection', None)
+    if country_connection is not None:
+        country_pool.release(country_connection)
+    user_connection = g.pop('user_connection', None)
+    if user_connection is not None:
+        user_pool.release(user_connection)
+
 
 @app.route('/quiz/capital', methods=['GET'])
 def render_capital_quiz_page():
@@ -41,9 +204,7 @@ def render_capital_quiz_page():
     if session['status'] != 'level_up':
         session['score'] = 0
         session['status'] = 'beginner'
-    connection = sqlite3.connect("database/countries.db")
-    first_option, second_option, third_option, correct_option = get_random_quiz_data(
-        connection, 'capital')
+    first_option, second_option, third_option, correct_option = question_pools['capital'].pop()
     session['first_option_country'] = first_option.capital
     session['second_option_country'] = second_option.capital
     session['third_option_country'] = third_option.capital
@@ -79,8 +240,7 @@ def render_continent_quiz_page():
     Returns:
         The rendered template for the continent quiz page.
     """
-    connection = sqlite3.connect("database/countries.db")
-    list_continents = return_options_for_continents(connection)
+    list_continents = question_pools['continent'].pop()
     session['first_option_country'] = list_continents[0].continent
     session['second_option_country'] = list_continents[1].continent
     session['third_option_country'] = list_continents[2].continent
@@ -116,9 +276,8 @@ def render_population_quiz_page():
     Returns:
         The rendered population quiz page.
     """
-    connection = sqlite3.connect("database/countries.db")
-    first_country, second_country, third_country, correct_country = get_random_quiz_data(
-        connection, 'population')
+    first_country, second_country, third_country, correct_country = question_pools[
+        'population'].pop()
     session['first_option_country'] = first_country.population
     session['second_option_country'] = second_country.population
     session['third_option_country'] = third_country.population
@@ -154,9 +313,8 @@ def render_area_quiz_page():
     Returns:
         The rendered HTML template for the area quiz page.
     """
-    connection = sqlite3.connect("database/countries.db")
-    first_country, second_country, third_country, correct_country = get_random_quiz_data(
-        connection, 'area')
+    first_country, second_country, third_country, correct_country = question_pools[
+        'area'].pop()
     session['first_option_country'] = first_country.area
     session['second_option_country'] = second_country.area
     session['third_option_country'] = third_country.area
@@ -192,9 +350,8 @@ def render_currency_quiz_page():
     Returns:
         The rendered template for the currency quiz page.
     """
-    connection = sqlite3.connect("database/countries.db")
-    first_country, second_country, third_country, correct_country = get_random_quiz_data(
-        connection, 'currency')
+    first_country, second_country, third_country, correct_country = question_pools[
+        'currency'].pop()
     session['first_option_country'] = first_country.currency
     session['second_option_country'] = second_country.currency
     session['third_option_country'] = third_country.currency
@@ -246,7 +403,7 @@ def home():
     Returns:
         The rendered template for the landing page.
     """
-    user_connection = sqlite3.connect("database/user.db")
+    user_connection = get_user_connection()
     create_tables_for_user_db(user_connection)
     session.clear()
     if request.method == 'POST':
@@ -259,7 +416,8 @@ def home():
                     "can only contain letters and numbers."
                 )
             )
-        if check_username_exists(user_connection, username):
+        if check_username_exists(user_connection, username) or \
+                get_leaderboard(USER_DB_PATH).has_pending_game(username):
             return render_template(
                 'index.html', message="User already exists!")
         session['username'] = username
@@ -277,10 +435,10 @@ def highscore():
     Returns:
         The rendered highscore.html template.
     """
-    user_connection = sqlite3.connect("database/user.db")
-    set_user_score(user_connection, session['username'], session['score'])
-    top_ten = get_top_ten_score(user_connection)
-    user_rank = get_rank_for_username(user_connection, session['username'])
+    leaderboard = get_leaderboard(USER_DB_PATH)
+    leaderboard.add_score(session['username'], session['score'])
+    top_ten = leaderboard.top(10)
+    user_rank = leaderboard.rank(session['username'])
     user_rank_text = 0
     if user_rank > 10:
         user_rank_text = user_rank
@@ -291,41 +449,138 @@ def highscore():
         enumerate=enumerate)
 
 
+def chart_url(name):
+    """
+    Returns the URL of a chart, versioned by its ETag so that browsers can
+    cache it until the country data changes.
+    """
+    from visual_helper import get_chart  # pylint: disable=import-outside-toplevel
+    _, etag = get_chart(name, get_country_connection(), database_file_stamp(COUNTRY_DB_PATH))
+    return url_for('chart', name=name, v=etag)
+
+
+@app.route('/charts/<name>', methods=['GET'])
+def chart(name):
+    """
+    Returns a chart of the country data as a PNG image from the chart cache.
+
+    Requests for the current version (the 'v' argument equals the ETag) may be
+    cached for a year; other requests have to be revalidated with the ETag and
+    are answered with 304 Not Modified if the chart did not change.
+
+    Returns:
+        The PNG response, 304 Not Modified, or 404 for unknown charts.
+    """
+    from visual_helper import get_chart  # pylint: disable=import-outside-toplevel
+    try:
+        png, etag = get_chart(
+            name, get_country_connection(), database_file_stamp(COUNTRY_DB_PATH))
+    except KeyError:
+        abort(404)
+    response = app.response_class(png, mimetype='image/png')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    if request.args.get('v') == etag:
+        response.cache_control.max_age = CHART_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
 @app.route('/quiz/diagrams', methods=['GET'])
 def diagrams():
     """
-    This function connects to the 'countries.db' database, plots the top five largest
-    countries and the top five population countries, and returns the 'diagrams.html' template.
+    Renders the 'diagrams.html' template with the charts of the top five largest
+    countries and the top five population countries.
     """
-    connection = sqlite3.connect("database/countries.db")
-    plot_top_five_largest_countries(connection)
-    plot_top_five_population_countries(connection)
-    return render_template('diagrams.html')
+    return render_template(
+        'diagrams.html',
+        area_chart_url=chart_url('topfiveareacountry.png'),
+        population_chart_url=chart_url('topfivepopulationcountry.png'))
 
 
 @app.route('/quiz/stats', methods=['GET'])
 def stats():
     """
-    Retrieves continent area and population data from the database and renders the 'stats.html' template.
+    Renders the 'stats.html' template with the correlation between the area and
+    population of the countries, computed once per version of the country data,
+    and the continent statistics precomputed when the database was built.
+
+    Returns:
+        The rendered template with the statistics passed to the context.
+    """
+    from statistics_service import get_area_population_statistics  # pylint: disable=import-outside-toplevel
+    statistics = get_area_population_statistics(COUNTRY_DB_PATH)
+    return render_template('stats.html', corr_coeff=statistics.correlation, hypothesis_test=statistics.verdict,
+                           p_value=statistics.p_value, continent_stats=statistics.continent_stats,
+                           correlation_chart_url=chart_url('CorrelationAreaPopulation.png'))
+
+
+@app.route('/api/countries/aggregates', methods=['GET'])
+def country_aggregates():
+    """
+    Returns the area, population and density statistics of every continent and
+    the countries with the largest value of a metric as JSON.
+
+    The query arguments 'metric' ('area', 'population' or 'density', the
+    default), 'top' (the number of countries, 5 by default) and 'continent'
+    select the ranking.
+
+    Returns:
+        A JSON response with the statistics, 400 for an unknown metric or 404
+        for an unknown continent.
+    """
+    from country_aggregates import METRICS, get_country_aggregates  # pylint: disable=import-outside-toplevel
+    metric = request.args.get('metric', 'density')
+    if metric not in METRICS:
+        abort(400)
+    count = request.args.get('top', 5, type=int)
+    continent = request.args.get('continent')
+    aggregates = get_country_aggregates(COUNTRY_DB_PATH)
+    try:
+        top = aggregates.top(metric, count, continent)
+    except KeyError:
+        abort(404)
+    return jsonify({
+        'version': aggregates.version,
+        'continents': aggregates.summary(),
+        'top': {
+            'metric': metric,
+            'continent': continent,
+            'countries': [{'name': name, metric: value} for name, value in top],
+        },
+    })
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Returns runtime counters that help sizing the server, such as the
+    connection pool usage, the depth of the question pools and the outcome
+    of the last country data refresh and the score write-behind queue.
 
     Returns:
-        The rendered template with the retrieved data passed to the context.
+        A JSON response with the collected counters.
     """
-    connection = sqlite3.connect("database/countries.db")
-    corr_coeff = get_correlation_coefficient(connection)
-    hypothesis = hypothesis_test(connection)
-    return render_template('stats.html', corr_coeff=corr_coeff.correlation, hypothesis_test=hypothesis, p_value=corr_coeff.pvalue)
+    return jsonify({
+        'connection_pools': {
+            'countries': country_pool.stats(),
+            'users': user_pool.stats(),
+        },
+        'question_pools': {
+            quiz_type: pool.stats() for quiz_type, pool in question_pools.items()
+        },
+        'country_refresh': refresh_scheduler.status(),
+        'score_writer': get_leaderboard(USER_DB_PATH).writer.stats(),
+    })
 
 
 if __name__ == '__main__':
-    COUNTRY_DB_PATH = "database/countries.db"
-    THIRTY_DAYS = 30 * 24 * 60 * 60
-
-    if not os.path.exists(COUNTRY_DB_PATH) or \
-            (time.time() - os.path.getmtime(COUNTRY_DB_PATH)) > THIRTY_DAYS:
-        country_connection = sqlite3.connect(COUNTRY_DB_PATH)
-        create_tables_for_country_db(country_connection)
-        fetch_and_insert_data(country_connection)
-        print("Data fetched and inserted into the database.")
+    if not os.path.exists(COUNTRY_DB_PATH):
+        refresh_scheduler.run_once()
+    refresh_scheduler.start()
+    get_country_snapshot(COUNTRY_DB_PATH)
+    threading.Thread(target=warm_up, daemon=True).start()
+    get_leaderboard(USER_DB_PATH)
     app.run(debug=True,host='0.0.0.0', port=80,)
-    
\ No newline at end of file
@@ -0,0 +1,247 @@
+"""
+This module keeps the scores of all finished games in memory so that the
+highscore page can be served without sorting or scanning the 'Users' table.
+"""
+import bisect
+import collections
+import sqlite3
+import threading
+
+from database_operations.database_config import connect
+from database_operations.user_database_operations import create_tables_for_user_db
+from refresh_scheduler import start_catch_up
+from score_writer import ScoreWriter
+from user import User
+
+
+class _FenwickTree:
+    """
+    Binary indexed tree of counts per score, growing with the largest score.
+    """
+
+    def __init__(self):
+        self.tree = [0] * 1025
+        self.total = 0
+
+    def _grow(self, score):
+        counts = [self.count_at(index) for index in range(len(self.tree) - 1)]
+        size = len(self.tree) - 1
+        while size <= score:
+            size *= 2
+        self.tree = [0] * (size + 1)
+        self.total = 0
+        for index, count in enumerate(counts):
+            if count:
+                self.add(index, count)
+
+    def add(self, score, count=1):
+        """
+        Adds count games with the given score.
+        """
+        if score >= len(self.tree) - 1:
+            self._grow(score)
+        self.total += count
+        index = score + 1
+        while index < len(self.tree):
+            self.tree[index] += count
+            index += index & -index
+
+    def count_up_to(self, score):
+        """
+        Returns the number of games with a score of at most score.
+        """
+        index = min(score + 1, len(self.tree) - 1)
+        result = 0
+        while index > 0:
+            result += self.tree[index]
+            index -= index & -index
+        return result
+
+    def count_at(self, score):
+        """
+        Returns the number of games with exactly the given score.
+        """
+        return self.count_up_to(score) - (self.count_up_to(score - 1) if score else 0)
+
+
+class Leaderboard:
+    """
+    Order statistics over the scores of all finished games.
+
+    Ranks are answered by a Fenwick tree of score counts and the best games
+    are kept in a small sorted list, so adding a score, looking up a rank and
+    reading the top games take O(log n) time regardless of the number of games.
+    New scores are handed to an optional ScoreWriter for persistence.
+
+    Games stored by other processes are added with load(), which reads the rows
+    inserted since the last call by user_id. Games recorded with add_score()
+    are skipped when their row shows up, so they are not counted twice.
+    """
+
+    def __init__(self, writer=None, top_capacity=10):
+        self.writer = writer
+        self.top_capacity = top_capacity
+        self._counts = _FenwickTree()
+        self._top = []
+        self._scores = {}
+        self._sequence = 0
+        self._last_user_id = 0
+        self._pending = collections.Counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_connection(cls, connection, writer=None):
+        """
+        Builds a leaderboard from all games stored in the 'Users' table.
+
+        Args:
+            connection (sqlite3.Connection): The connection to the user database.
+            writer (ScoreWriter): The writer that persists new scores.
+
+        Returns:
+            Leaderboard: The loaded leaderboard.
+        """
+        leaderboard = cls(writer)
+        leaderboard.load(connection)
+        return leaderboard
+
+    def load(self, connection):
+        """
+        Adds the games stored since the last call that were not recorded
+        with add_score().
+
+        Args:
+            connection (sqlite3.Connection): The connection to the user database.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(
+                    "SELECT user_id, name, score FROM Users WHERE user_id > ? ORDER BY user_id",
+                    (self._last_user_id,))
+                for user_id, username, score in cursor:
+                    score = score or 0
+                    if self._pending[(username, score)]:
+                        self._pending[(username, score)] -= 1
+                        if not self._pending[(username, score)]:
+                            del self._pending[(username, score)]
+                    else:
+                        self._add(username, score)
+                    self._last_user_id = user_id
+            except sqlite3.Error as e:
+                print("SQLite Error:", e)
+
+    def _add(self, username, score):
+        """
+        Adds a game without persisting it. Must be called with the lock held
+        or before the leaderboard is shared.
+        """
+        self._counts.add(max(score, 0))
+        self._scores.setdefault(username, score)
+        self._sequence += 1
+        entry = (-score, self._sequence, username)
+        if len(self._top) < self.top_capacity or entry < self._top[-1]:
+            bisect.insort(self._top, entry)
+            del self._top[self.top_capacity:]
+
+    def add_score(self, username, score):
+        """
+        Records a finished game and queues it for persistence.
+
+        Args:
+            username (str): The username of the user.
+            score (int): The score of the game.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._add(username, score)
+            if self.writer is not None:
+                self._pending[(username, score)] += 1
+        if self.writer is not None:
+            self.writer.submit(username, score)
+
+    def has_pending_game(self, username):
+        """
+        Checks if a game of the user was recorded with add_score() but has not
+        been read back from the 'Users' table yet, e.g. because it is still
+        waiting in the write-behind queue.
+
+        Args:
+            username (str): The username of the user.
+
+        Returns:
+            bool: True if such a game exists, False otherwise.
+        """
+        with self._lock:
+            return any(name == username for name, _ in self._pending)
+
+    def top(self, count=10):
+        """
+        Returns the best games.
+
+        Args:
+            count (int): The number of games, at most top_capacity.
+
+        Returns:
+            list: A list of User objects ordered by descending score.
+        """
+        with self._lock:
+            return [User(0, username, -negative_score)
+                    for negative_score, _, username in self._top[:count]]
+
+    def rank(self, username):
+        """
+        Returns the rank of a user, i.e. one more than the number of games
+        with a higher score than the user's first game.
+
+        Args:
+            username (str): The username of the user.
+
+        Returns:
+            int: The rank of the user, 1 if the user has no games.
+        """
+        with self._lock:
+            score = self._scores.get(username)
+            if score is None:
+                return 1
+            return self._counts.total - self._counts.count_up_to(max(score, 0)) + 1
+
+
+_leaderboards = {}
+_leaderboards_lock = threading.Lock()
+_catch_up_schedulers = {}
+
+
+def get_leaderboard(database_path):
+    """
+    Returns the leaderboard of the given user database, loading it on first use
+    and starting the background thread that adds the games of other processes.
+
+    Args:
+        database_path (str): The path to the user database.
+
+    Returns:
+        Leaderboard: The shared leaderboard.
+    """
+    leaderboard = _leaderboards.get(database_path)
+    if leaderboard is not None:
+        return leaderboard
+    with _leaderboards_lock:
+        leaderboard = _leaderboards.get(database_path)
+        if leaderboard is None:
+            connection = connect(database_path, 'users')
+            try:
+                create_tables_for_user_db(connection)
+                leaderboard = Leaderboard.from_connection(
+                    connection, ScoreWriter(database_path))
+            finally:
+                connection.close()
+            _catch_up_schedulers[database_path] = start_catch_up(
+                leaderboard.load, database_path, 'users')
+            _leaderboards[database_path] = leaderboard
+    return leaderboard
@@ -0,0 +1,152 @@
+"""
+This module contains a bounded buffer of ready-made quiz questions that is
+refilled on a background thread, so quiz pages only have to pop a question.
+"""
+import collections
+import threading
+import time
+
+
+class QuestionPool:
+    """
+    Keeps up to max_size pre-generated questions for one quiz type.
+
+    When the number of buffered questions drops below low_water_mark, a
+    background thread generates new questions until the buffer is full again.
+    If the buffer is empty, pop() generates a question synchronously.
+
+    If version is given, it is called before each question is generated and
+    buffered questions whose version differs from the current one are dropped
+    by pop(), so questions about replaced country data are never served.
+    """
+
+    def __init__(self, generate_question, max_size=50, low_water_mark=10, version=None):
+        self.generate_question = generate_question
+        self.version = version
+        self.max_size = max_size
+        self.low_water_mark = low_water_mark
+        self._questions = collections.deque()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self._generated = 0
+        self._misses = 0
+        self._discarded = 0
+        self._refill_seconds = 0.0
+
+    def start(self):
+        """
+        Starts the background refill thread if it is not running yet.
+
+        Returns:
+            None
+        """
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._refill, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stops the background refill thread.
+
+        Returns:
+            None
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def clear(self):
+        """
+        Drops all buffered questions.
+
+        Returns:
+            None
+        """
+        with self._condition:
+            self._questions.clear()
+            self._condition.notify_all()
+
+    def pop(self):
+        """
+        Returns a buffered question, or generates one if the buffer is empty.
+
+        Returns:
+            The question as returned by generate_question.
+        """
+        self.start()
+        version = self._current_version()
+        with self._condition:
+            if self._questions and self._questions[0][0] != version:
+                fresh = [entry for entry in self._questions if entry[0] == version]
+                self._discarded += len(self._questions) - len(fresh)
+                self._questions = collections.deque(fresh)
+            if self._questions:
+                _, question = self._questions.popleft()
+                if len(self._questions) < self.low_water_mark:
+                    self._condition.notify_all()
+                return question
+            self._misses += 1
+            self._condition.notify_all()
+        return self.generate_question()
+
+    def _current_version(self):
+        """
+        Returns the current version of the data the questions are generated from.
+        """
+        return self.version() if self.version is not None else None
+
+    def _refill(self):
+        """
+        Refills the buffer whenever it drops below the low-water mark.
+        """
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._stopped or len(self._questions) < self.low_water_mark)
+                if self._stopped:
+                    return
+            start = time.perf_counter()
+            generated = 0
+            while len(self._questions) < self.max_size and not self._stopped:
+                try:
+                    version = self._current_version()
+                    question = self.generate_question()
+                except Exception as e:  # pylint: disable=broad-except
+                    print("Error in generating question:", e)
+                    time.sleep(1)
+                    break
+                with self._condition:
+                    self._questions.append((version, question))
+                generated += 1
+            with self._condition:
+                self._generated += generated
+                self._refill_seconds += time.perf_counter() - start
+
+    def stats(self):
+        """
+        Returns counters describing the state of the pool.
+
+        Returns:
+            dict: The current depth, the limits, the number of questions generated
+            in the background and their rate per second, the number of pops
+            that found the buffer empty and the number of outdated questions
+            that were dropped.
+        """
+        with self._condition:
+            return {
+                'depth': len(self._questions),
+                'max_size': self.max_size,
+                'low_water_mark': self.low_water_mark,
+                'generated': self._generated,
+                'refill_rate': (self._generated / self._refill_seconds
+                                if self._refill_seconds else 0.0),
+                'misses': self._misses,
+                'discarded': self._discarded,
+            }
@@ -0,0 +1,162 @@
+"""
+This module runs a refresh job, such as rebuilding the country database,
+periodically on a background thread so that it never blocks requests.
+"""
+import fcntl
+import os
+import random
+import threading
+import time
+
+from database_operations.database_config import connect
+
+# Seconds between two reads of the rows that other processes inserted.
+CATCH_UP_INTERVAL = 1.0
+
+
+class RefreshScheduler:
+    """
+    Runs a job every interval seconds (plus or minus a random jitter) on a
+    daemon thread.
+
+    An exclusive, non-blocking lock on lock_path makes sure that only one
+    process runs the job at a time; the others skip that run. The outcome
+    of the last run is kept for monitoring.
+    """
+
+    def __init__(self, job, interval, jitter=0.1, lock_path=None):
+        self.job = job
+        self.interval = interval
+        self.jitter = jitter
+        self.lock_path = lock_path
+        self._run_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._status = {
+            'runs': 0,
+            'last_status': None,
+            'last_started': None,
+            'last_duration': None,
+            'last_result': None,
+            'last_error': None,
+            'next_run': None,
+        }
+
+    def _next_delay(self):
+        """
+        Returns the number of seconds until the next run, including the jitter.
+        """
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def run_once(self):
+        """
+        Runs the job now unless another thread or process is already running it.
+
+        Returns:
+            str: 'ok', 'failed' or 'skipped'.
+        """
+        if not self._run_lock.acquire(blocking=False):
+            return 'skipped'
+        lock_file = None
+        try:
+            if self.lock_path is not None:
+                lock_file = open(self.lock_path, 'a', encoding='utf-8')
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    self._status['last_status'] = 'skipped'
+                    return 'skipped'
+            started = time.time()
+            self._status['last_started'] = started
+            try:
+                self._status['last_result'] = self.job()
+                self._status['last_error'] = None
+                self._status['last_status'] = 'ok'
+            except Exception as e:  # pylint: disable=broad-except
+                print("Error in refresh job:", repr(e))
+                self._status['last_error'] = repr(e)
+                self._status['last_status'] = 'failed'
+            self._status['last_duration'] = time.time() - started
+            self._status['runs'] += 1
+            return self._status['last_status']
+        finally:
+            if lock_file is not None:
+                lock_file.close()
+            self._run_lock.release()
+
+    def start(self, initial_delay=0):
+        """
+        Starts the background thread if it is not running yet.
+
+        Args:
+            initial_delay (float): Seconds to wait before the first run.
+
+        Returns:
+            None
+        """
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(initial_delay,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the background thread after the current run.
+
+        Returns:
+            None
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self, delay):
+        """
+        Runs the job repeatedly until stop() is called.
+        """
+        while True:
+            self._status['next_run'] = time.time() + delay
+            if self._stop_event.wait(delay):
+                return
+            self.run_once()
+            delay = self._next_delay()
+
+    def status(self):
+        """
+        Returns the outcome of the last run and the time of the next one.
+
+        Returns:
+            dict: The number of runs, the status, start time, duration, result and
+            error of the last run, and the time of the next run.
+        """
+        return dict(self._status, pid=os.getpid())
+
+
+def start_catch_up(load, database_path, database, interval=CATCH_UP_INTERVAL):
+    """
+    Starts a scheduler that calls load with a new connection to a database every
+    interval seconds, e.g. to add the rows that other processes inserted to an
+    in-memory structure.
+
+    Args:
+        load (callable): Called with a sqlite3.Connection.
+        database_path (str): The path to the database file.
+        database (str): 'countries' or 'users', selects the connection settings.
+        interval (float): The number of seconds between two runs.
+
+    Returns:
+        RefreshScheduler: The started scheduler.
+    """
+    def catch_up():
+        connection = connect(database_path, database)
+        try:
+            load(connection)
+        finally:
+            connection.close()
+
+    scheduler = RefreshScheduler(catch_up, interval)
+    scheduler.start(initial_delay=interval)
+    return scheduler
@@ -0,0 +1,204 @@
+"""
+This module persists finished games to the user database on a background
+thread, so that requests do not wait for the INSERT and commit.
+"""
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+
+from database_operations.database_config import connect
+from database_operations.user_database_operations import (
+    create_tables_for_user_db, set_user_scores)
+
+# Number of times a failed group commit is retried before its rows are
+# written one by one, and the delay before the first retry in seconds.
+BATCH_RETRIES = 3
+RETRY_DELAY = 0.1
+
+
+class ScoreWriter:
+    """
+    Write-behind queue of (username, score) rows for the 'Users' table.
+
+    The writer thread commits the queued rows in groups: a group is written as
+    soon as it holds max_batch_size rows or its oldest row has waited max_delay
+    seconds. If the writer is closed or the queue is full, submit() writes the
+    row synchronously instead. Queued rows are flushed when the process exits.
+
+    A group that cannot be committed (e.g. because the database stayed locked
+    longer than the busy timeout) is retried BATCH_RETRIES times with a growing
+    delay and then written row by row, so a failure loses as few games as
+    possible. Rows that still fail are counted in the stats.
+    """
+
+    def __init__(self, database_path, max_batch_size=100, max_delay=0.05,
+                 max_queue_size=10000):
+        self.database_path = database_path
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._queue = queue.Queue(max_queue_size)
+        self._thread = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self._stats = {'written': 0, 'batches': 0, 'synchronous_writes': 0,
+                       'retries': 0, 'failed': 0}
+
+    def start(self):
+        """
+        Starts the writer thread if it is not running yet.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def submit(self, username, score):
+        """
+        Queues a score to be inserted into the user database.
+
+        Args:
+            username (str): The username of the user.
+            score (int): The score of the finished game.
+
+        Returns:
+            None
+        """
+        self.start()
+        with self._lock:
+            if not self._closed:
+                try:
+                    self._queue.put_nowait((username, score))
+                    return
+                except queue.Full:
+                    pass
+        self._write_synchronously([(username, score)])
+
+    def flush(self):
+        """
+        Blocks until every queued score has been written.
+
+        Returns:
+            None
+        """
+        self._queue.join()
+
+    def close(self):
+        """
+        Writes the queued scores and stops the writer thread.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._closed = True
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _write_synchronously(self, scores):
+        """
+        Writes scores on the calling thread with its own connection.
+        """
+        try:
+            connection = connect(self.database_path, 'users')
+        except sqlite3.Error as e:
+            print("SQLite Error:", e)
+            saved = False
+        else:
+            try:
+                create_tables_for_user_db(connection)
+                saved = set_user_scores(connection, scores)
+            finally:
+                connection.close()
+        with self._lock:
+            if saved:
+                self._stats['written'] += len(scores)
+                self._stats['synchronous_writes'] += 1
+            else:
+                self._stats['failed'] += len(scores)
+
+    def _write_batch(self, connection, batch):
+        """
+        Commits a group of scores, retrying it and then falling back to
+        writing its rows one by one if the commit fails.
+        """
+        for attempt in range(BATCH_RETRIES + 1):
+            if attempt:
+                with self._lock:
+                    self._stats['retries'] += 1
+                time.sleep(RETRY_DELAY * 2 ** (attempt - 1))
+            if set_user_scores(connection, batch):
+                with self._lock:
+                    self._stats['written'] += len(batch)
+                    self._stats['batches'] += 1
+                return
+        print(f"Writing {len(batch)} scores one by one after failed group commits")
+        for score in batch:
+            self._write_synchronously([score])
+
+    def _next_batch(self):
+        """
+        Waits for a score and collects the scores that follow it within max_delay.
+
+        Returns:
+            tuple: The batch and whether the writer has been asked to stop.
+        """
+        batch = []
+        item = self._queue.get()
+        deadline = time.monotonic() + self.max_delay
+        while item is not None:
+            batch.append(item)
+            if len(batch) >= self.max_batch_size:
+                return batch, False
+            timeout = deadline - time.monotonic()
+            try:
+                item = (self._queue.get(timeout=timeout) if timeout > 0
+                        else self._queue.get_nowait())
+            except queue.Empty:
+                return batch, False
+        self._queue.task_done()
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, True
+            batch.append(item)
+
+    def _run(self):
+        """
+        Writes the queued scores in groups until close() is called.
+        """
+        connection = connect(self.database_path, 'users')
+        create_tables_for_user_db(connection)
+        stopped = False
+        while not stopped:
+            batch, stopped = self._next_batch()
+            if batch:
+                self._write_batch(connection, batch)
+                for _ in batch:
+                    self._queue.task_done()
+        connection.close()
+
+    def stats(self):
+        """
+        Returns counters describing the writer.
+
+        Returns:
+            dict: The queue length, the number of scores written, the number of
+            group commits and their mean size, the number of synchronous writes,
+            the number of retried group commits and the number of scores that
+            could not be written.
+        """
+        with self._lock:
+            stats = dict(self._stats, queued=self._queue.qsize())
+        stats['mean_batch_size'] = (
+            (stats['written'] - stats['synchronous_writes']) / stats['batches']
+            if stats['batches'] else 0.0)
+        return stats
@@ -0,0 +1,84 @@
+"""
+This module computes the area/population statistics of the stats page once per
+version of the country database and keeps the result in memory.
+"""
+import numpy as np
+from scipy import stats
+
+from database_operations.connection_pool import FileStampCache
+from database_operations.countries_database_operations import (
+    get_all_areas_and_population, get_continent_stats)
+
+SIGNIFICANCE_LEVEL = 0.05
+
+
+class AreaPopulationStatistics:
+    """
+    The Pearson correlation between the area and population of all countries
+    and the verdict of the hypothesis test that they are uncorrelated.
+
+    The columns are kept as NumPy arrays so that further statistics can be
+    derived without querying the database again. The per-continent statistics
+    precomputed at build time are kept alongside.
+    """
+
+    def __init__(self, areas, populations, continent_stats=None,
+                 significance_level=SIGNIFICANCE_LEVEL):
+        self.continent_stats = continent_stats or {}
+        self.areas = np.asarray(areas, dtype=float)
+        self.populations = np.asarray(populations, dtype=float)
+        self.significance_level = significance_level
+        result = stats.pearsonr(self.areas, self.populations)
+        self.correlation = result.statistic
+        self.p_value = result.pvalue
+        self.null_hypothesis_rejected = bool(self.p_value < significance_level)
+
+    @classmethod
+    def from_connection(cls, connection):
+        """
+        Loads the area and population of all countries and the continent statistics.
+
+        Args:
+            connection (sqlite3.Connection): The connection to the country database.
+
+        Returns:
+            AreaPopulationStatistics: The computed statistics.
+        """
+        rows = np.array(get_all_areas_and_population(connection), dtype=float).reshape(-1, 2)
+        return cls(rows[:, 0], rows[:, 1], get_continent_stats(connection))
+
+    @property
+    def verdict(self):
+        """
+        Returns the outcome of the hypothesis test as a sentence for the stats page.
+        """
+        if self.null_hypothesis_rejected:
+            return "The null hypothesis is rejected. There is a significant correlation between area and population."
+        return "The null hypothesis cannot be rejected. There is no significant correlation between area and population."
+
+
+def _load_statistics(connection):
+    """
+    Computes the statistics of a country database and logs the test result.
+    """
+    statistics = AreaPopulationStatistics.from_connection(connection)
+    print(f"Correlation coefficient: {statistics.correlation}")
+    print(f"P-Value: {statistics.p_value}")
+    return statistics
+
+
+_statistics = FileStampCache(_load_statistics, 'countries')
+
+
+def get_area_population_statistics(database_path):
+    """
+    Returns the statistics of the given database, computing them on first use
+    and again whenever the database file has been replaced or modified.
+
+    Args:
+        database_path (str): The path to the country database.
+
+    Returns:
+        AreaPopulationStatistics: The cached statistics.
+    """
+    return _statistics.get(database_path)
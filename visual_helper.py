@@ -1,19 +1,169 @@
 """
 This module contains visual helper functions for the quiz services.
+
+Charts are drawn on explicit Figure objects, never on the pyplot global state,
+so every rendered figure is freed with its last reference. Rendering is
+serialized by a lock because matplotlib styles are applied through the
+process-wide rcParams.
+
+Charts are rendered into memory once per version of the country data (the
+stamp of the database file) and kept in a small LRU cache together with an
+ETag, so they can be served directly from memory. They are only written to
+disk by export_charts().
 """
-import matplotlib.pyplot as plt
+import argparse
+import collections
+import contextlib
+import hashlib
+import io
+import os
+import threading
+
+import matplotlib
 import matplotlib.style
 import numpy as np
-import pandas as pd
-from scipy import stats
-from scipy.stats import pearsonr
+from matplotlib.figure import Figure
+from database_operations.connection_pool import connection_file_stamp
+from database_operations.database_config import connect
 from database_operations.countries_database_operations import (
-    get_all_areas,
-    get_all_population,
+    get_all_areas_and_population,
     get_top_five_largest_countries,
     get_top_five_population_countries,
 )
 
+matplotlib.use('Agg')
+
+CHART_DIRECTORY = 'static/diagrams'
+CHART_CACHE_SIZE = 16
+
+# (chart name, data version) -> (PNG bytes, ETag), least recently used first.
+_chart_cache = collections.OrderedDict()
+_chart_lock = threading.Lock()
+_render_lock = threading.RLock()
+
+
+def _draw_pie(rows, title):
+    """
+    Draws a pie chart of (label, value) rows on a new figure.
+    """
+    labels, values = zip(*rows)
+    figure = Figure(figsize=(8, 6))
+    axes = figure.subplots()
+    axes.pie(values, labels=labels, autopct='%1.1f%%')
+    axes.set_title(title)
+    return figure
+
+
+def _draw_top_five_largest_countries(country_connection):
+    """
+    Draws a pie chart of the top 5 largest countries by area on a new figure.
+    """
+    return _draw_pie(get_top_five_largest_countries(country_connection),
+                     'Top 5 Largest Countries by Area')
+
+
+def _draw_top_five_population_countries(country_connection):
+    """
+    Draws a pie chart of the top 5 largest countries by population on a new figure.
+    """
+    return _draw_pie(get_top_five_population_countries(country_connection),
+                     'Top 5 Largest Countries by Population')
+
+
+def _draw_correlation_area_population(country_connection):
+    """
+    Draws a scatter plot of the area and population of all countries on a new figure.
+    """
+    columns = np.array(get_all_areas_and_population(country_connection),
+                       dtype=float).reshape(-1, 2)
+    figure = Figure()
+    axes = figure.subplots()
+    axes.scatter(columns[:, 0], columns[:, 1])
+    axes.set_title("Correlation between Area and Population")
+    return figure
+
+
+# Chart name -> (draw function, matplotlib style).
+CHARTS = {
+    'topfiveareacountry.png': (_draw_top_five_largest_countries, None),
+    'topfivepopulationcountry.png': (_draw_top_five_population_countries, None),
+    'CorrelationAreaPopulation.png': (_draw_correlation_area_population, 'ggplot'),
+}
+
+
+def render_chart(name, country_connection):
+    """
+    Renders a chart of the country data as PNG, bypassing the chart cache.
+
+    Parameters:
+    - name: The name of the chart, a key of CHARTS.
+    - country_connection: The connection to the country database.
+
+    Returns:
+    The PNG bytes of the chart.
+
+    Raises:
+    KeyError: If there is no chart with the given name.
+    """
+    draw, style = CHARTS[name]
+    buffer = io.BytesIO()
+    with _render_lock:
+        with matplotlib.style.context(style) if style else contextlib.nullcontext():
+            figure = draw(country_connection)
+            figure.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+def _get_cached_chart(key):
+    """
+    Returns the cached chart for a (name, version) key, or None.
+    """
+    if key[1] is None:
+        return None
+    with _chart_lock:
+        chart = _chart_cache.get(key)
+        if chart is not None:
+            _chart_cache.move_to_end(key)
+        return chart
+
+
+def get_chart(name, country_connection, version=None):
+    """
+    Returns a chart of the country data, rendering it only if it is not cached
+    for the current version of the data.
+
+    Parameters:
+    - name: The name of the chart, a key of CHARTS.
+    - country_connection: The connection to the country database.
+    - version: The stamp of the database file, if the caller already knows it.
+
+    Returns:
+    A tuple of the PNG bytes and their ETag.
+
+    Raises:
+    KeyError: If there is no chart with the given name.
+    """
+    if name not in CHARTS:
+        raise KeyError(name)
+    if version is None:
+        version = connection_file_stamp(country_connection)
+    key = (name, version)
+    chart = _get_cached_chart(key)
+    if chart is not None:
+        return chart
+    with _render_lock:
+        chart = _get_cached_chart(key)
+        if chart is not None:
+            return chart
+        png = render_chart(name, country_connection)
+        chart = (png, hashlib.sha256(png).hexdigest()[:32])
+        if version is not None:
+            with _chart_lock:
+                _chart_cache[key] = chart
+                while len(_chart_cache) > CHART_CACHE_SIZE:
+                    _chart_cache.popitem(last=False)
+    return chart
+
 
 def plot_top_five_largest_countries(country_connection):
     """
@@ -23,17 +173,9 @@ def plot_top_five_largest_countries(country_connection):
     - country_connection: The connection to the country database.
 
     Returns:
-    None
+    The PNG bytes of the chart.
     """
-
-    top_area = get_top_five_largest_countries(country_connection)
-    countries, areas = zip(*top_area)
-    df = pd.DataFrame({'Country': countries, 'Area': areas})
-    plt.figure(figsize=(8, 6))
-    plt.pie(df['Area'], labels=df['Country'], autopct='%1.1f%%')
-    plt.title('Top 5 Largest Countries by Area')
-    plt.savefig('static/diagrams/topfiveareacountry.png')
-    plt.close()
+    return get_chart('topfiveareacountry.png', country_connection)[0]
 
 
 def plot_top_five_population_countries(country_connection):
@@ -44,59 +186,85 @@ def plot_top_five_population_countries(country_connection):
     - country_connection: The connection to the country database.
 
     Returns:
-    None
+    The PNG bytes of the chart.
     """
-    top_population = get_top_five_population_countries(country_connection)
-    countries, populations = zip(*top_population)
-    df = pd.DataFrame({'Country': countries, 'Population': populations})
-    plt.figure(figsize=(8, 6))
-    plt.pie(df['Population'], labels=df['Country'], autopct='%1.1f%%')
-    plt.title('Top 5 Largest Countries by Population')
-    plt.savefig('static/diagrams/topfivepopulationcountry.png')
-    plt.close()
+    return get_chart('topfivepopulationcountry.png', country_connection)[0]
 
 
-def hypothesis_test(country_connection):
+def prerender_charts(database_path):
     """
-    Perform a hypothesis test to determine the correlation between area and population.
+    Renders the charts of a freshly built country database, so that the first
+    request for them does not have to.
 
     Parameters:
-    - country_connection: The connection to the country data.
+    - database_path: The path to the country database.
 
     Returns:
-    - A string indicating whether the null hypothesis is rejected or not.
+    None
     """
+    connection = connect(database_path, 'countries', read_only=True)
+    try:
+        for name in CHARTS:
+            get_chart(name, connection)
+    finally:
+        connection.close()
 
-    areas = get_all_areas(country_connection)
-    population = get_all_population(country_connection)
-    correlation, p_value = stats.pearsonr(areas, population)
 
-    print(f"Correlation coefficient: {correlation}")
-    print(f"P-Value: {p_value}")
+def _write_chart(path, png):
+    """
+    Writes the PNG bytes to a temporary file next to path and renames it over
+    path, so that readers never see a partially written image.
+    """
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'wb') as chart_file:
+        chart_file.write(png)
+    os.replace(temporary_path, path)
 
-    significance_level = 0.05
-    if p_value < significance_level:
-        return "The null hypothesis is rejected. There is a significant correlation between area and population."
-    else:
-        return "The null hypothesis cannot be rejected. There is no significant correlation between area and population."
 
-def get_correlation_coefficient(connection):
+def export_charts(country_connection, directory=CHART_DIRECTORY):
     """
-    Calculate the correlation coefficient between the area and population of a given connection.
+    Writes every chart of the country data as a PNG file into a directory.
 
     Parameters:
-    connection (object): The connection object used to retrieve data.
+    - country_connection: The connection to the country database.
+    - directory: The directory to write the files to.
 
     Returns:
-    tuple: A tuple containing the correlation coefficient and the p-value.
-
-    """
-    area = get_all_areas(connection)
-    population = get_all_population(connection)
-    print(np.corrcoef(area, population))
-    matplotlib.style.use("ggplot")
-    plt.scatter(area, population)
-    plt.title("Correlation between Area and Population")
-    plt.savefig('static/diagrams/CorrelationAreaPopulation.png')
-    corr_coeff = pearsonr(area, population)
-    return corr_coeff
+    A list of the written paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name in CHARTS:
+        path = os.path.join(directory, name)
+        _write_chart(path, get_chart(name, country_connection)[0])
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    """
+    Exports the charts of a country database as PNG files.
+
+    Parameters:
+    - argv: The command line arguments, defaults to sys.argv.
+
+    Returns:
+    None
+    """
+    parser = argparse.ArgumentParser(description="Export the charts of the country database.")
+    parser.add_argument('--database', default='database/countries.db',
+                        help="path of the SQLite country database")
+    parser.add_argument('--output', default=CHART_DIRECTORY,
+                        help="directory to write the PNG files to")
+    args = parser.parse_args(argv)
+
+    connection = connect(args.database, 'countries', read_only=True)
+    try:
+        for path in export_charts(connection, args.output):
+            print("Exported", path)
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()